@@ -0,0 +1,190 @@
+"""Batch CLI: answer a JSONL file of queries through the OpenAI Batch API.
+
+Bulk, non-interactive runs (evals, re-scoring a query set) don't need the
+interactive ReAct loop. Each query is guarded and retrieved locally, then all
+answer prompts go out as one batch job at half the per-token cost and outside
+the per-minute rate limits.
+
+Usage:
+    python -m src.app_batch queries.jsonl [results.jsonl]
+
+Each input line is {"query": "..."} with an optional "id" (the line number
+by default); ids must be unique, since they become the batch custom_ids.
+"""
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+from src.config import DATA_DIR, LOG_LEVEL, OPENAI_MODEL, TEMPERATURE, TOP_K
+from src.graph.nodes import finalize_node
+from src.graph.registry import load_index_and_chunks
+from src.graph.state import State, build_initial_state
+from src.guards.policy import apply_guards
+from src.rag.retriever import retrieve
+from src.llm.client import client
+from src.observability.logging_config import configure_logging
+
+configure_logging(LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+BATCH_DIR = DATA_DIR / "batch"
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_POLL_SECONDS = 30
+BATCH_TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+RAG_SYSTEM_PROMPT = (
+    "You are a helpful assistant that answers questions based ONLY on the provided documents. "
+    "If the documents don't contain the answer, say so."
+)
+
+
+def load_queries(path: Path) -> List[Dict]:
+    """Read {"id", "query"} records from a JSONL file, rejecting duplicate ids."""
+    records = []
+    seen_ids = set()
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record_id = str(record.get("id", line_no))
+            if record_id in seen_ids:
+                raise ValueError(f"Duplicate id {record_id!r} on line {line_no + 1} of {path}")
+            seen_ids.add(record_id)
+            records.append({"id": record_id, "query": record["query"]})
+    return records
+
+
+def build_rag_messages(query: str, chunks: List[Dict]) -> List[Dict]:
+    """Build the answer prompt for a query and its retrieved chunks."""
+    context = "\n\n".join(f"[{c['source']}]\n{c['content']}" for c in chunks)
+    return [
+        {"role": "system", "content": RAG_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Documents:\n{context}\n\nQuestion: {query}\nAnswer: "},
+    ]
+
+
+def prepare_states(records: List[Dict]) -> Dict[str, State]:
+    """Guard and retrieve for every query; refused queries get their answer here."""
+    index, chunks = load_index_and_chunks()
+    states = {}
+    for record in records:
+        # Ids become batch custom_ids; a repeat would overwrite an answer
+        if record["id"] in states:
+            raise ValueError(f"Duplicate id {record['id']!r}")
+        state = build_initial_state(record["query"])
+        passed, refusal_msg, masked_query = apply_guards(record["query"])
+        if not passed:
+            state["final_answer"] = refusal_msg
+        else:
+            state["query"] = masked_query
+            state["retrieved_chunks"] = retrieve(masked_query, index, chunks, k=TOP_K)
+            state["citations"] = list(dict.fromkeys(
+                c["source"] for c in state["retrieved_chunks"]))
+        states[record["id"]] = state
+    return states
+
+
+def write_batch_input(states: Dict[str, State], path: Path) -> int:
+    """Write one chat-completions request per unanswered state; returns the count."""
+    count = 0
+    with open(path, "w") as f:
+        for custom_id, state in states.items():
+            if state["final_answer"]:
+                continue
+            request = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": OPENAI_MODEL,
+                    "temperature": TEMPERATURE,
+                    "messages": build_rag_messages(state["query"], state["retrieved_chunks"]),
+                },
+            }
+            f.write(json.dumps(request) + "\n")
+            count += 1
+    return count
+
+
+def submit_batch(input_path: Path):
+    """Upload the request file and start a batch job."""
+    with open(input_path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    logger.info(f"Submitted batch {batch.id}")
+    return batch
+
+
+def wait_for_batch(batch_id: str, poll_seconds: int = BATCH_POLL_SECONDS):
+    """Poll until the batch reaches a terminal state."""
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in BATCH_TERMINAL_STATES:
+            return batch
+        logger.info(f"Batch {batch_id} is {batch.status}; checking again in {poll_seconds}s")
+        time.sleep(poll_seconds)
+
+
+def parse_batch_output(text: str) -> Dict[str, str]:
+    """Map custom_id to answer text for every successful response line."""
+    answers = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            logger.warning(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+            continue
+        answers[record["custom_id"]] = (
+            response["body"]["choices"][0]["message"]["content"].strip())
+    return answers
+
+
+def run_batch(records: List[Dict]) -> Dict[str, State]:
+    """Answer every record, returning finalized states keyed by id."""
+    BATCH_DIR.mkdir(parents=True, exist_ok=True)
+    states = prepare_states(records)
+    input_path = BATCH_DIR / "batch_input.jsonl"
+    if write_batch_input(states, input_path):
+        batch = wait_for_batch(submit_batch(input_path).id)
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+        answers = parse_batch_output(client.files.content(batch.output_file_id).text)
+        for custom_id, answer in answers.items():
+            states[custom_id]["final_answer"] = answer
+    return {custom_id: finalize_node(state) for custom_id, state in states.items()}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.app_batch queries.jsonl [results.jsonl]")
+        sys.exit(1)
+
+    input_path = Path(sys.argv[1])
+    output_path = Path(sys.argv[2]) if len(sys.argv) > 2 else BATCH_DIR / "results.jsonl"
+    records = load_queries(input_path)
+    states = run_batch(records)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        for record in records:
+            state = states[record["id"]]
+            f.write(json.dumps({
+                "id": record["id"],
+                "query": record["query"],
+                "final_answer": state["final_answer"],
+                "citations": state["citations"],
+            }) + "\n")
+    print(f"Wrote {len(records)} results to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
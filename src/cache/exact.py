@@ -0,0 +1,104 @@
+"""Persistent exact-match cache for agent responses."""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+from src.config import CACHE_DIR, CACHE_TTL_SECONDS, OPENAI_MODEL, TEMPERATURE, TOP_K
+
+logger = logging.getLogger(__name__)
+
+CACHE_DB = CACHE_DIR / "exact.sqlite"
+
+
+def make_key(*parts: Any) -> str:
+    """Build a stable SHA-256 cache key from the given parts."""
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different spellings share a key."""
+    return query.strip().lower()
+
+
+def response_cache_key(query: str, index_version: Any = None) -> str:
+    """Cache key for a full agent response to `query`.
+
+    `index_version` identifies the document index the answer was built from
+    (see registry.index_version), so a re-ingest starts a fresh set of keys.
+    """
+    return make_key(OPENAI_MODEL, TEMPERATURE, TOP_K, index_version, normalize_query(query))
+
+
+class ExactCache:
+    """SQLite-backed key/value store with per-entry expiry.
+
+    Values must be JSON-serializable. Entries are grouped by namespace so
+    several caches can share one database file.
+    """
+
+    def __init__(self, path: Path = CACHE_DB, namespace: str = "default"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires_at REAL, PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None if missing/expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, expire: Optional[float] = CACHE_TTL_SECONDS):
+        """Store `value` under `key`, expiring after `expire` seconds (None = never)."""
+        expires_at = time.time() + expire if expire else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), expires_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Remove `key` from the cache."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry in this namespace."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            self._conn.commit()
+
+
+_response_cache: Optional[ExactCache] = None
+
+
+def get_response_cache() -> ExactCache:
+    """Lazy load the response cache on first use."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ExactCache(namespace="response")
+        logger.debug(f"Response cache opened at {CACHE_DB}")
+    return _response_cache
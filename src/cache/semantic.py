@@ -0,0 +1,153 @@
+"""Semantic (embedding-similarity) cache for agent responses."""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+import numpy as np
+import orjson
+import faiss
+from src.config import (
+    INDEX_DIR, CACHE_TTL_SECONDS, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_ENTRIES,
+    OPENAI_MODEL, TEMPERATURE, TOP_K,
+)
+from src.cache.exact import make_key
+from src.rag.retriever import embed_text
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_INDEX = INDEX_DIR / "sem_cache.faiss"
+
+
+def semantic_cache_path(model: str = OPENAI_MODEL, temperature: float = TEMPERATURE,
+                        top_k: int = TOP_K) -> Path:
+    """Index file for one configuration, fingerprinted like response_cache_key.
+
+    Matches are made on the embedding alone, so answers produced under another
+    model, temperature or top_k live in their own file and are never served.
+    """
+    fingerprint = make_key(model, temperature, top_k)[:16]
+    return SEMANTIC_CACHE_INDEX.with_name(
+        f"{SEMANTIC_CACHE_INDEX.stem}-{fingerprint}{SEMANTIC_CACHE_INDEX.suffix}")
+
+
+def embed_query(text: str) -> np.ndarray:
+    """Embed `text` as a float32 row vector, sharing the retriever's embedding cache."""
+    return np.array([embed_text(text)], dtype="float32")
+
+
+class SemanticCache:
+    """Nearest-neighbour cache over L2-normalized query embeddings.
+
+    Lookups return the value of the most similar cached entry when its cosine
+    similarity is at least `threshold`. Entries are evicted least-recently-used
+    once `max_entries` is reached; the flat index is exact and fast enough at
+    that size, so no IVF/LSH approximation is used.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl: Optional[float] = CACHE_TTL_SECONDS,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index = None
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()
+        self._next_id = 0
+        if path is not None and path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, embedding: np.ndarray) -> Optional[Any]:
+        """Return the cached value closest to `embedding`, or None on a miss."""
+        query = _normalized(embedding)
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return None
+            similarities, ids = self._index.search(query, 1)
+            similarity, entry_id = float(similarities[0][0]), int(ids[0][0])
+            entry = self._entries.get(entry_id)
+            if entry is None or similarity < self.threshold:
+                return None
+            if self.ttl and entry["timestamp"] + self.ttl < time.time():
+                self._remove(entry_id)
+                return None
+            self._entries.move_to_end(entry_id)
+        logger.info(
+            f"Semantic cache hit ({similarity:.3f}) for '{entry['query'][:50]}'")
+        return entry["value"]
+
+    def add(self, embedding: np.ndarray, value: Any, query: str = ""):
+        """Cache `value` under `embedding`, evicting the oldest entry if full.
+
+        `query` is only kept for log messages and is written to disk with the
+        entry, so pass it PII-masked. `value` must be JSON-serializable.
+        """
+        vector = _normalized(embedding)
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+            while self.max_entries and len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.array([entry_id], dtype="int64"))
+            self._entries[entry_id] = {
+                "query": query, "value": value, "timestamp": time.time()}
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._index = None
+            self._entries.clear()
+
+    def save(self):
+        """Persist the index and metadata to `path`."""
+        if self.path is None or self._index is None:
+            return
+        with self._lock:
+            faiss.write_index(self._index, str(self.path))
+            # Entries as [id, entry] pairs so the LRU order survives the round trip
+            meta = {"next_id": self._next_id, "entries": list(self._entries.items())}
+            with open(self.path.with_suffix(".json"), "wb") as f:
+                f.write(orjson.dumps(meta))
+
+    def _load(self):
+        meta_path = self.path.with_suffix(".json")
+        if not meta_path.exists():
+            return
+        self._index = faiss.read_index(str(self.path))
+        with open(meta_path, "rb") as f:
+            meta = orjson.loads(f.read())
+        self._entries = OrderedDict((int(entry_id), entry) for entry_id, entry in meta["entries"])
+        self._next_id = meta["next_id"]
+
+    def _remove(self, entry_id: int):
+        self._index.remove_ids(np.array([entry_id], dtype="int64"))
+        self._entries.pop(entry_id, None)
+
+
+def _normalized(embedding: np.ndarray) -> np.ndarray:
+    vector = np.array(embedding, dtype="float32").reshape(1, -1)
+    faiss.normalize_L2(vector)
+    return vector
+
+
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Lazy load the persisted response semantic cache on first use."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache(semantic_cache_path())
+    return _semantic_cache
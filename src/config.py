@@ -9,11 +9,13 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 CORPUS_DIR = DATA_DIR / "corpus"
 INDEX_DIR = DATA_DIR / "index"
+CACHE_DIR = DATA_DIR / "cache"
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.0"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "15"))
 
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_DEFAULT_CHANNEL = os.getenv("SLACK_DEFAULT_CHANNEL", "#general")
@@ -21,12 +23,31 @@ SLACK_DEFAULT_CHANNEL = os.getenv("SLACK_DEFAULT_CHANNEL", "#general")
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "50"))
 TOP_K = int(os.getenv("TOP_K", "5"))
+INDEX_TYPE = os.getenv("INDEX_TYPE", "flat")  # "flat" (exact), "hnsw" or "ivfpq" (approximate)
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+# IVFPQ exact re-rank looks at k * IVF_REFINE_K_FACTOR PQ candidates
+IVF_REFINE_K_FACTOR = float(os.getenv("IVF_REFINE_K_FACTOR", "4"))
+CHUNK_STORE_FORMAT = os.getenv("CHUNK_STORE_FORMAT", "jsonl")  # "jsonl" or "parquet" (pyarrow)
 
 MAX_NODE_ITERATIONS = int(os.getenv("MAX_NODE_ITERATIONS", "10"))
 MAX_TOOL_HOPS = int(os.getenv("MAX_TOOL_HOPS", "3"))
+TOOL_CONTEXT_TOKEN_BUDGET = int(os.getenv("TOOL_CONTEXT_TOKEN_BUDGET", "2000"))
 TOOL_TIMEOUT_SECONDS = int(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+ROUTER_RULES_ENABLED = os.getenv("ROUTER_RULES_ENABLED", "1") == "1"
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "86400"))
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+# In-memory reuse of search results for near-duplicate queries
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE_ENABLED", "1") == "1"
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "1") == "1"
+TRACE_MAX_RECORDS = int(os.getenv("TRACE_MAX_RECORDS", "10000"))
 
 CORPUS_DIR.mkdir(parents=True, exist_ok=True)
 INDEX_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
@@ -1,6 +1,7 @@
 """Build the LangGraph agent graph."""
 from langgraph.graph import StateGraph, END, START
 from src.graph.state import State
+from src.graph.registry import warm_index
 from src.graph.nodes import (
     finalize_node, tool_node,
     initialize_node, guard_node
@@ -25,6 +26,18 @@ def build_graph():
     return graph.compile()
 
 
+_graph = None
+
+
+def get_graph():
+    """Compile the graph once per process and reuse it across invocations."""
+    global _graph
+    if _graph is None:
+        warm_index()
+        _graph = build_graph()
+    return _graph
+
+
 if __name__ == "__main__":
     graph = build_graph()
     print("Graph built successfully!")
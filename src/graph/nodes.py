@@ -1,17 +1,30 @@
+import hashlib
 from enum import Enum
 from typing import List, Dict, Any
-from datetime import datetime
-import json
 import logging
+import re
 import time
-from src.config import TOP_K, OPENAI_MODEL, MAX_TOOL_HOPS, TEMPERATURE, MAX_NODE_ITERATIONS
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+import orjson
+import tiktoken
+from src.config import (
+    TOP_K, OPENAI_MODEL, MAX_TOOL_HOPS, TEMPERATURE, MAX_NODE_ITERATIONS, ROUTER_RULES_ENABLED,
+    LLM_TIMEOUT_SECONDS, TOOL_CONTEXT_TOKEN_BUDGET,
+)
 from src.graph.state import State, ToolCall, build_initial_state
-from src.graph.registry import load_index_and_chunks, load_tools
+from src.graph.registry import load_index_and_chunks, load_tools, READ_ONLY_TOOLS
+from src.graph.router_rules import classify, plan_first_action
 from src.rag.retriever import retrieve
 from src.guards.policy import apply_guards, mask_pii, check_grounding_required
 from src.observability.telemetry import log_react_step, log_tool_call, log_node_entry, log_node_exit
-from openai import OpenAI
-client = OpenAI()
+from src.llm.client import client
+
+
+def prompt_cache_key(*static_parts: Any) -> str:
+    """Route requests sharing a static prompt prefix to the same OpenAI prompt cache."""
+    return hashlib.sha1(
+        orjson.dumps(static_parts, option=orjson.OPT_SORT_KEYS, default=str)).hexdigest()
 
 
 class NodeName(str, Enum):
@@ -33,148 +46,329 @@ def guard_node(state: State) -> State:
     passed, refusal_msg, masked_query = apply_guards(
         query, retrieved_chunks=None)
     if not passed:
-        logging.warning(f"Query refused by guard: {refusal_msg}")
+        logging.warning("Query refused by guard: %s", refusal_msg)
         state["final_answer"] = refusal_msg
         if masked_query and masked_query != query:
             state["query"] = masked_query
     return state
 
 
+FINAL_ANSWER_RE = re.compile(r"Final Answer:\s*(.*)", re.S)
+
+ANSWER_SYSTEM_PROMPT = "You are a helpful assistant that answers questions based ONLY on the provided tools."
+ANSWER_INSTRUCTIONS = (
+    "You are given a question and a list of tool calls.\n"
+    "You need to use the tool calls to answer the question."
+)
+ANSWER_PROMPT_CACHE_KEY = prompt_cache_key(ANSWER_SYSTEM_PROMPT, ANSWER_INSTRUCTIONS)
+
+
 def generate_tool_call_answer(query: str, tool_calls: List[ToolCall]) -> str:
     """Generate a response using the tool calls."""
-    logging.debug(f"Tool calls for answer generation: {tool_calls}")
-    prompt = f"""You are given a question and a list of tool calls.
-    You need to use the tool calls to answer the question.
-    Tool calls: {tool_calls}
-    Question: {query}
-    Answer: """
+    # Rendering the whole list is O(N); skip it unless debug logging is on
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Tool calls for answer generation: %s", tool_calls)
+    # Static instructions first and the question last keeps the prompt prefix cacheable
+    prompt = (
+        f"{ANSWER_INSTRUCTIONS}\n"
+        f"Tool calls: {tool_calls}\n"
+        f"Question: {query}\n"
+        "Answer: "
+    )
     response = client.chat.completions.create(
         model=OPENAI_MODEL,
         messages=[
-            {"role": "system", "content": "You are a helpful assistant that answers questions based ONLY on the provided tools."},
+            {"role": "system", "content": ANSWER_SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
         temperature=TEMPERATURE,
+        stream=True,
+        timeout=LLM_TIMEOUT_SECONDS,
+        extra_body={"prompt_cache_key": ANSWER_PROMPT_CACHE_KEY},
     )
-    return response.choices[0].message.content.strip()
+    # Consume tokens as they arrive instead of waiting for the full completion
+    started = time.perf_counter()
+    parts = []
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if not parts:
+                logging.debug("Answer first token after %.0fms",
+                              (time.perf_counter() - started) * 1000)
+            parts.append(delta)
+    return "".join(parts).strip()
+
+
+# ReAct planner prompt, built once: it only depends on the static tool registry.
+# Tool names (not the function objects, whose repr changes every run) keep the
+# prefix identical across calls so it can be prompt-cached.
+_tools, _tool_definitions, _ = load_tools()
+PLANNER_SYSTEM_PROMPT = (
+    f"Answer the question using these tools: {', '.join(_tools)}.\n"
+    "Start by calling a tool, read its observation, and call more tools only if you still need information.\n"
+    "When you can answer, reply without a tool call: 'Final Answer: <answer to the original question>'.\n\n"
+    "**IMPORTANT:**\n"
+    "- After a tool reports success (e.g., 'Successfully sent message'), answer with the result; don't repeat the action.\n"
+    "- Never call the same tool with the same arguments twice."
+)
+PLANNER_PROMPT_CACHE_KEY = prompt_cache_key(PLANNER_SYSTEM_PROMPT, _tool_definitions)
+
+
+def _direct_answer(tool_calls: List[ToolCall]) -> str | None:
+    """Use the last tool result as the answer when it is already a sentence.
+
+    Tools like send_slack_message report their outcome as a complete string,
+    so another LLM call to rephrase it adds latency without adding information.
+    """
+    if not tool_calls:
+        return None
+    result = tool_calls[-1]["result"]
+    if isinstance(result, str) and result.strip() and not result.startswith("Error:"):
+        return result.strip()
+    return None
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        return tiktoken.encoding_for_model(OPENAI_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def _message_content(message) -> str:
+    content = message.get("content") if isinstance(message, dict) else message.content
+    return content or ""
+
+
+def _trim_observations(messages: List, budget: int, keep_chars: int = 200):
+    """Shorten older tool observations once the conversation exceeds `budget` tokens.
+
+    Observations from the latest hop (everything after the last assistant
+    message) are kept whole since the planner is acting on them.
+    """
+    encoding = _encoding()
+    total = sum(len(encoding.encode(_message_content(m))) for m in messages)
+    last_assistant = max((i for i, m in enumerate(messages)
+                          if not isinstance(m, dict) or m.get("role") == "assistant"), default=-1)
+    tool_messages = [m for m in messages[:last_assistant]
+                     if isinstance(m, dict) and m.get("role") == "tool"]
+    for message in tool_messages:
+        if total <= budget:
+            break
+        content = message["content"]
+        if len(content) <= keep_chars:
+            continue
+        shortened = content[:keep_chars] + " ...[truncated]"
+        total -= len(encoding.encode(content)) - len(encoding.encode(shortened))
+        message["content"] = shortened
+
+
+def _call_signature(tool_name: str, tool_args: Dict, normalizers: Dict) -> tuple:
+    """Hashable identity of a tool call, independent of argument order and spelling."""
+    normalize = normalizers.get(tool_name)
+    if normalize is not None:
+        tool_args = normalize(tool_args or {})
+    return tool_name, orjson.dumps(tool_args, option=orjson.OPT_SORT_KEYS, default=str)
+
+
+# Read-only tool calls from one planner turn run here, alongside the sequential ones
+_tool_executor = ThreadPoolExecutor(max_workers=4)
+
+
+def _call_tool(tools: Dict[str, Any], call: Dict) -> Any:
+    """Run one tool call, returning its result or the exception it raised."""
+    try:
+        return tools[call["name"]](**call["arguments"])
+    except Exception as e:
+        return e
+
+
+def _run_tool_calls(tools: Dict[str, Any], calls: List[Dict],
+                    started: List[Future | None] | None = None) -> List[Any]:
+    """Execute tool calls, returning results (or exceptions) in order.
+
+    Read-only tools run concurrently on a thread pool. Tools with side effects
+    run one at a time in the order the planner gave, so a "clear then create"
+    turn or a run of Slack messages keeps its meaning. `started` optionally
+    holds, per call, a future already computing it (a speculative prefetch).
+    """
+    started = started or [None] * len(calls)
+    futures = {i: started[i] or _tool_executor.submit(_call_tool, tools, call)
+               for i, call in enumerate(calls) if call["name"] in READ_ONLY_TOOLS}
+    outcomes = [None if i in futures else _call_tool(tools, call)
+                for i, call in enumerate(calls)]
+    for i, future in futures.items():
+        outcomes[i] = future.result()
+    return outcomes
 
 
 def tool_node(state: State) -> State:
     log_node_entry("tool", state)
-    tools, tool_definitions = load_tools()
+    tools, tool_definitions, tool_normalizers = load_tools()
     query = state["query"]
-    tool_names = ", ".join(list(tools.keys()))
-
-    # ReAct-style prompt
-    system = (
-        "Answer the following questions as best you can. You have access to the following tools:\n\n"
-        f"{tools}\n\nUse the following format:\n\n"
-        "Question: the input question you must answer\n"
-        "Thought: you should always think about what to do\n"
-        f"Action: the action to take, should be one of [{tool_names}]\n"
-        "Action Input: the input to the action\n"
-        "Observation: the result of the action\n"
-        "... (this Thought/Action/Action Input/Observation can repeat N times)\n"
-        "Thought: I now know the final answer\n"
-        "Final Answer: the final answer to the original input question\n\n"
-        "**IMPORTANT:**\n"
-        "- After a tool reports success (e.g., 'Successfully sent message'), stop, don't repeat actions, and summarize the result in your Final Answer.\n"
-        "- If you already retrieved information from a tool, use that information to answer. Do not call the same tool again with the same arguments.\n"
-        "- Once you have the information you need, provide your Final Answer immediately.\n\n"
-        "Begin!"
-    )
 
-    agent_scratchpad = ""
+    # Observations reach the planner as native tool messages; the scratchpad
+    # only records the trace for debugging, so it is skipped unless that's on
+    agent_scratchpad = "" if logging.getLogger().isEnabledFor(logging.DEBUG) else None
     messages = [
-        {"role": "system", "content": system.replace("{tools}", tool_names)},
+        {"role": "system", "content": PLANNER_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Question: {query}"},
     ]
 
-    final_answer: str | None = None
-    iteration = 0
-    for iteration in range(MAX_TOOL_HOPS):
-        user_content = (
-            f"Question: {query}\nThought:{agent_scratchpad}"
-        )
-        messages.append({"role": "user", "content": user_content})
-
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=messages,
-            tools=tool_definitions,
-            tool_choice="required",
-            temperature=TEMPERATURE,
-        )
-
-        choice = response.choices[0].message
-        tool_calls = choice.tool_calls
-
-        if not tool_calls:
-            logging.warning("No tool call selected by planner")
-            break
+    # Signatures of every call made so far, for O(1) duplicate detection
+    seen_calls = {_call_signature(c["name"], c.get("arguments"), tool_normalizers)
+                  for c in state.get("tool_calls", [])}
 
-        messages.append(choice)
+    parsed_args: Dict[str, Dict] = {}
 
-        tool_results = []
-        has_duplicate = False
-        for tool_call in tool_calls:
-            tool_name = tool_call.function.name
-            tool_args = json.loads(tool_call.function.arguments)
+    final_answer: str | None = None
+    rule_action = plan_first_action(query) if ROUTER_RULES_ENABLED else None
+    iteration = 0
+    # Possible document question the rules couldn't place: search for the
+    # question while the planner decides. Keyed by the normalized call
+    # signature, so only a planner rag_search of this same text uses it.
+    prefetched: Dict[tuple, Future] = {}
+    if ROUTER_RULES_ENABLED and not rule_action and classify(query) != "tool":
+        prefetch_call = {"name": "rag_search", "arguments": {"query": query}}
+        signature = _call_signature("rag_search", prefetch_call["arguments"], tool_normalizers)
+        prefetched[signature] = _tool_executor.submit(_call_tool, tools, prefetch_call)
+    try:
+        for iteration in range(MAX_TOOL_HOPS):
+            if iteration == 0 and rule_action:
+                # Obvious first step: skip the planner round-trip
+                logging.info("Rule-based first action: %s", rule_action.tool_name)
+                tool_calls = [(f"rule_{iteration}", rule_action.tool_name,
+                               orjson.dumps(rule_action.arguments).decode())]
+                messages.append({
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{
+                        "id": call_id, "type": "function",
+                        "function": {"name": name, "arguments": arguments},
+                    } for call_id, name, arguments in tool_calls],
+                })
+            else:
+                _trim_observations(messages, TOOL_CONTEXT_TOKEN_BUDGET)
+                response = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    tools=tool_definitions,
+                    # Force an action first; afterwards the planner may answer instead
+                    tool_choice="required" if iteration == 0 else "auto",
+                    temperature=TEMPERATURE,
+                    timeout=LLM_TIMEOUT_SECONDS,
+                    extra_body={"prompt_cache_key": PLANNER_PROMPT_CACHE_KEY},
+                )
+
+                choice = response.choices[0].message
+                if not choice.tool_calls:
+                    # The planner answered after reading every observation so far
+                    match = FINAL_ANSWER_RE.search(choice.content or "")
+                    answer = match.group(1) if match else choice.content
+                    if answer and answer.strip():
+                        final_answer = answer.strip()
+                    else:
+                        logging.warning("No tool call selected by planner")
+                    break
 
-            for prev_call in state.get("tool_calls", []):
-                if prev_call["name"] == tool_name and prev_call.get("arguments") == tool_args:
+                messages.append(choice)
+                tool_calls = [(tc.id, tc.function.name, tc.function.arguments)
+                              for tc in choice.tool_calls]
+
+            # Collect this hop's calls, stopping at the first repeat of an earlier one
+            pending = []
+            started = []  # prefetched future per pending call, if any
+            has_duplicate = False
+            for tool_call_id, tool_name, tool_args in tool_calls:
+                # Planners often repeat identical argument strings; parse each once
+                raw_args = tool_args
+                tool_args = parsed_args.get(raw_args)
+                if tool_args is None:
+                    tool_args = parsed_args[raw_args] = orjson.loads(raw_args)
+
+                signature = _call_signature(tool_name, tool_args, tool_normalizers)
+                if signature in seen_calls:
                     logging.warning(
-                        f"Duplicate tool call detected: {tool_name}({tool_args}). Stopping loop.")
+                        "Duplicate tool call detected: %s(%s). Stopping loop.", tool_name, tool_args)
                     has_duplicate = True
                     break
+                seen_calls.add(signature)
+
+                log_react_step("action", f"{tool_name}({tool_args})", {
+                               "iteration": iteration})
+                pending.append(
+                    (tool_call_id, {"name": tool_name, "arguments": tool_args}))
+                started.append(prefetched.pop(signature, None))
+
+            outcomes = _run_tool_calls(tools, [call for _, call in pending], started)
+
+            tool_results = []
+            for (tool_call_id, call), outcome in zip(pending, outcomes):
+                tool_name, tool_args = call["name"], call["arguments"]
+                if isinstance(outcome, Exception):
+                    error_msg = f"Error: {str(outcome)}"
+                    logging.error("Tool call %s failed: %s", tool_name, error_msg)
+                    log_react_step("observation", error_msg, {
+                                   "tool": tool_name, "error": True, "iteration": iteration})
+                    result = error_msg
+                    state["tool_calls"].append(
+                        ToolCall(name=tool_name, arguments=tool_args, result=error_msg, timestamp_ns=time.time_ns()))
+                else:
+                    state["tool_calls"].append(
+                        ToolCall(name=tool_name, arguments=tool_args, result=outcome, timestamp_ns=time.time_ns()))
+
+                    result = str(outcome)[:500]
+                    log_react_step("observation", result, {
+                                   "tool": tool_name, "iteration": iteration})
+
+                tool_results.append({
+                    "tool_call_id": tool_call_id,
+                    "role": "tool",
+                    "name": tool_name,
+                    "content": result
+                })
+
+                # Update scratchpad with Observation and a new Thought
+                if agent_scratchpad is not None:
+                    agent_scratchpad += (
+                        f"\nAction: {tool_name}\nAction Input: {tool_args}\n"
+                        f"Observation: {str(result)[:500]}\nThought:"
+                    )
+
+            # A rule-planned calculation is the whole answer unless it failed
+            if (iteration == 0 and rule_action and rule_action.terminal and pending
+                    and not isinstance(outcomes[0], Exception)):
+                final_answer = f"{rule_action.arguments['expr']} = {outcomes[0]}"
+                break
 
             if has_duplicate:
+                final_answer = _direct_answer(state["tool_calls"]) or generate_tool_call_answer(
+                    query, state["tool_calls"])
                 break
 
-            log_react_step("action", f"{tool_name}({tool_args})", {
-                           "iteration": iteration})
-
-            tool_fn = tools[tool_name]
-            try:
-                result = tool_fn(**tool_args)
-
-                state["tool_calls"].append(
-                    ToolCall(name=tool_name, arguments=tool_args, result=result, timestamp=datetime.now()))
-
-                result = str(result)[:500]
-                log_react_step("observation", result, {
-                               "tool": tool_name, "iteration": iteration})
-            except Exception as e:
-                error_msg = f"Error: {str(e)}"
-                logging.error(f"Tool call {tool_name} failed: {error_msg}")
-                log_react_step("observation", error_msg, {
-                               "tool": tool_name, "error": True, "iteration": iteration})
-                result = error_msg
-                state["tool_calls"].append(
-                    ToolCall(name=tool_name, arguments=tool_args, result=error_msg, timestamp=datetime.now()))
-
-            tool_results.append({
-                "tool_call_id": tool_call.id,
-                "role": "tool",
-                "name": tool_name,
-                "content": result
-            })
-
-            # Update scratchpad with Observation and a new Thought
-            result_str = str(result)[:500]
-            agent_scratchpad += (
-                f"\nAction: {tool_name}\nAction Input: {tool_args}\nObservation: {result_str}\nThought:"
-            )
-
-        if has_duplicate:
-            final_answer = generate_tool_call_answer(
-                query, state["tool_calls"])
-            break
-
-        messages.extend(tool_results)
+            messages.extend(tool_results)
+    finally:
+        # Drop speculative searches nobody asked for, cancelling any not yet started
+        for future in prefetched.values():
+            future.cancel()
 
     if not final_answer:
         final_answer = generate_tool_call_answer(query, state["tool_calls"])
 
+    if agent_scratchpad is not None:
+        logging.debug("Agent scratchpad: %s", agent_scratchpad)
+
+    # Chunks the agent actually read, cited in first-retrieved order
+    state["retrieved_chunks"] = [
+        chunk for call in state["tool_calls"]
+        if call["name"] == "rag_search" and isinstance(call["result"], list)
+        for chunk in call["result"]
+    ]
+    state["citations"] = list(dict.fromkeys(
+        chunk["source"] for chunk in state["retrieved_chunks"]))
     state["final_answer"] = final_answer
     state["iteration_count"] += 1
     log_node_exit("tool", state)
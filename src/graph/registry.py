@@ -1,29 +1,101 @@
+import logging
+import re
+import threading
+from typing import Callable, Dict, List, Union
 from src.tools.calculator import safe_calculate
 from src.tools.calendar_mock import list_events, create_event, clear_events
-from src.rag.retriever import load_index, load_chunks, retrieve
+from src.rag.retriever import (
+    load_index, load_chunks, retrieve, retrieve_batch, clear_retriever_cache, INDEX_FILE,
+)
 from src.tools.slack import send_message
 
+logger = logging.getLogger(__name__)
+
 _index = None
 _chunks = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+
+def _index_file_mtime():
+    try:
+        return INDEX_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def index_version():
+    """Version of the on-disk index (its mtime; ingest replaces the file), or None."""
+    return _index_file_mtime()
 
 
 def load_index_and_chunks():
-    """Lazy load index and chunks on first use."""
-    global _index, _chunks
-    if _index is None:
-        _index = load_index()
-        _chunks = load_chunks()
+    """Lazy load index and chunks once per process, reloading if the index is rebuilt."""
+    global _index, _chunks, _index_mtime
+    mtime = _index_file_mtime()
+    if _index is None or mtime != _index_mtime:
+        with _index_lock:
+            if _index is None or mtime != _index_mtime:
+                old_chunks = _chunks
+                _index = load_index()
+                _chunks = load_chunks()
+                _index_mtime = mtime
+                clear_retriever_cache()
+                # Release the previous store's file and mapping (the legacy
+                # pickle format is a plain list with nothing to close)
+                if hasattr(old_chunks, "close"):
+                    old_chunks.close()
     return _index, _chunks
 
 
-def rag_search(query: str, k: int = 5):
-    """Retrieve top-k relevant chunks for a query (RAG as a tool)."""
+def _warm_index():
+    try:
+        load_index_and_chunks()
+    except Exception as e:  # no index built yet; rag_search will report it
+        logger.debug("Index warm-up skipped: %s", e)
+
+
+_warmup_started = False
+
+
+def warm_index():
+    """Load the index in the background so the first rag_search doesn't wait on it.
+
+    Called by entry points, not at import; only the first call starts a thread.
+    """
+    global _warmup_started
+    with _index_lock:
+        if _warmup_started:
+            return
+        _warmup_started = True
+    threading.Thread(target=_warm_index, name="index-warmup", daemon=True).start()
+
+
+def _rag_search(query: str, k: int):
     index, chunks = load_index_and_chunks()
     results = retrieve(query, index, chunks, k=k)
     # Return lean payload for tool observation
     return [{"source": c["source"], "content": c["content"]} for c in results]
 
 
+def _rag_search_batch(queries: List[str], k: int):
+    index, chunks = load_index_and_chunks()
+    results = retrieve_batch(queries, index, chunks, k=k)
+    # One flat observation; each chunk notes which query found it
+    return [
+        {"query": query, "source": c["source"], "content": c["content"]}
+        for query, chunks_for_query in zip(queries, results)
+        for c in chunks_for_query
+    ]
+
+
+def rag_search(query: Union[str, List[str]], k: int = 5):
+    """Retrieve top-k relevant chunks for a query, or for each of several (RAG as a tool)."""
+    if isinstance(query, list):
+        return _rag_search_batch([str(q) for q in query], int(k))
+    return _rag_search(query, int(k))
+
+
 tools = {
     "safe_calculate": safe_calculate,
     "list_events": list_events,
@@ -32,7 +104,10 @@ tools = {
     "rag_search": rag_search,
     "send_slack_message": send_message,
 }
-tool_definitions = [
+# Tools without side effects; runs that only used these are safe to cache
+READ_ONLY_TOOLS = frozenset({"safe_calculate", "rag_search"})
+# A tuple so the shared definitions can't be appended to or reordered by callers
+tool_definitions = (
     {
         "type": "function",
         "function": {
@@ -117,8 +192,12 @@ tool_definitions = [
                 "type": "object",
                 "properties": {
                     "query": {
-                        "type": "string",
-                        "description": "Text to search in the document corpus"
+                        "anyOf": [
+                            {"type": "string"},
+                            {"type": "array", "items": {"type": "string"}}
+                        ],
+                        "description": "Text to search in the document corpus, or a list "
+                                       "of texts to search in one call"
                     },
                     "k": {
                         "type": "number",
@@ -149,10 +228,54 @@ tool_definitions = [
                 "required": ["text"]
             }
         }
-    }
-]
+    },
+)
+
+
+_COMMUTATIVE_EXPR_RE = re.compile(r"[\d.]+(?:\*[\d.]+)+|[\d.]+(?:\+[\d.]+)+")
+
+
+def _normalize_calculation(args: Dict) -> Dict:
+    """Ignore whitespace and operand order of pure sums/products ("10*5" == "5 * 10")."""
+    expr = "".join(str(args.get("expr", "")).split())
+    if _COMMUTATIVE_EXPR_RE.fullmatch(expr):
+        op = "*" if "*" in expr else "+"
+        expr = op.join(sorted(expr.split(op)))
+    return {"expr": expr}
+
+
+def _normalize_date_range(args: Dict) -> Dict:
+    """Ignore case, padding and omitted (empty) date bounds."""
+    return {key: str(value).strip().lower() for key, value in args.items() if value}
+
+
+def _normalize_rag_search(args: Dict) -> Dict:
+    """Ignore case/whitespace in the query and an explicit default k."""
+    try:
+        k = int(float(args.get("k", 5)))
+    except (TypeError, ValueError):
+        k = args.get("k")
+    query = args.get("query", "")
+    if isinstance(query, list):
+        query = [" ".join(str(q).split()).lower() for q in query]
+    else:
+        query = " ".join(str(query).split()).lower()
+    return {"query": query, "k": k}
+
+
+# Per-tool argument canonicalization used only to detect repeated calls
+tool_normalizers: Dict[str, Callable[[Dict], Dict]] = {
+    "safe_calculate": _normalize_calculation,
+    "list_events": _normalize_date_range,
+    "rag_search": _normalize_rag_search,
+}
 
 
 def load_tools():
-    """Load tools and tool definitions on first use."""
-    return tools, tool_definitions
+    """Return the tool registry (built once at import).
+
+    Returns:
+        (tools, tool_definitions, tool_normalizers) tuple
+    """
+    return tools, tool_definitions, tool_normalizers
+
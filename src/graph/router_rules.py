@@ -0,0 +1,60 @@
+"""Rule-based routing for queries whose first action is obvious."""
+import re
+from typing import Dict, NamedTuple, Optional
+
+# Bare arithmetic, optionally phrased as a question ("What is 10 * 5?")
+_ARITHMETIC_RE = re.compile(
+    r"^\s*(?:what\s+is|what's|calculate|compute|evaluate)?\s*"
+    r"(?P<expr>[-+(\s]*\d[\d\s.+\-*/()]*?[\d)])\s*[?.!]?\s*$",
+    re.IGNORECASE,
+)
+_OPERATOR_RE = re.compile(r"\d\s*\)*\s*(?:\*\*|[-+*/])\s*\(*\s*-?\d")
+# Dates and phone numbers that would otherwise parse as subtraction/division
+_NOT_ARITHMETIC_RE = re.compile(
+    r"(?<![\d.])(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}/\d{4}|\d{3}-\d{3}-\d{4})(?![\d.])")
+
+# Queries that need tool arguments only the planner can work out
+_TOOL_RE = re.compile(
+    r"\b(calendar|schedule|meeting|event|slack|channel|send|message|calculate|compute)\b",
+    re.IGNORECASE,
+)
+# Questions answered from the document corpus
+_RAG_RE = re.compile(
+    r"\b(policy|policies|allowance|procedure|onboarding|payroll|relocation|define|explain)\b",
+    re.IGNORECASE,
+)
+
+
+class RuleAction(NamedTuple):
+    """A tool call decided without asking the planner."""
+    tool_name: str
+    arguments: Dict
+    terminal: bool  # The tool result fully answers the query
+
+
+def arithmetic_expression(query: str) -> Optional[str]:
+    """Return the expression if the query is plain arithmetic, else None."""
+    match = _ARITHMETIC_RE.match(query)
+    if (match and _OPERATOR_RE.search(match.group("expr"))
+            and not _NOT_ARITHMETIC_RE.search(match.group("expr"))):
+        return match.group("expr").strip()
+    return None
+
+
+def classify(query: str) -> str:
+    """Classify a query as "tool", "rag" or "unknown"."""
+    if arithmetic_expression(query) or _TOOL_RE.search(query):
+        return "tool"
+    if _RAG_RE.search(query):
+        return "rag"
+    return "unknown"
+
+
+def plan_first_action(query: str) -> Optional[RuleAction]:
+    """Pick the first tool call for obvious queries; None defers to the planner."""
+    expr = arithmetic_expression(query)
+    if expr:
+        return RuleAction("safe_calculate", {"expr": expr}, terminal=True)
+    if classify(query) == "rag":
+        return RuleAction("rag_search", {"query": query}, terminal=False)
+    return None
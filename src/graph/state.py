@@ -1,12 +1,11 @@
 from typing import TypedDict, Dict, List, Optional, Any
-from datetime import datetime
 
 
 class ToolCall(TypedDict):
     name: str
     arguments: Dict
     result: Any
-    timestamp: datetime
+    timestamp_ns: int  # time.time_ns(); cheaper than datetime.now() in the tool loop
 
 
 class State(TypedDict):
@@ -16,16 +15,18 @@ class State(TypedDict):
     citations: Optional[List[str]]
     messages: List[Dict]
     tool_calls: Optional[List[ToolCall]]
-    iteration_count: int = 0
+    iteration_count: int
 
 
 def build_initial_state(query: str) -> State:
-    state = State(
-        query=query,
-        retrieved_chunks=[],
-        final_answer="",
-        citations=[],
-        messages=[],
-        tool_calls=[],
-        iteration_count=0)
-    return state
+    # A literal rather than a copied template: a shallow copy would share the
+    # list fields between states
+    return {
+        "query": query,
+        "retrieved_chunks": [],
+        "final_answer": "",
+        "citations": [],
+        "messages": [],
+        "tool_calls": [],
+        "iteration_count": 0,
+    }
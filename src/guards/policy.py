@@ -1,4 +1,5 @@
 """Guards and policies for the agent."""
+import os
 import re
 import logging
 from typing import Dict, List, Optional, Tuple
@@ -15,15 +16,61 @@ REFUSE_PATTERNS = [
     (r"generate.*letter|write.*contract|draft.*document|create.*legal",
      "document_generation"),
 ]
+# Fused into one alternation so the query is scanned once; the named group
+# that matched is the refusal category. When a query hits several categories,
+# the earliest match in the query wins rather than the list order.
+_REFUSE_RE = re.compile(
+    "|".join(f"(?P<{category}>{pattern})" for pattern, category in REFUSE_PATTERNS),
+    re.IGNORECASE,
+)
+
+# Refusal message per REFUSE_PATTERNS category
+REFUSAL_TEMPLATES = {
+    "legal": (
+        "I cannot provide legal advice. For legal questions, please consult "
+        "with a qualified attorney. I can help answer questions about company "
+        "policies and procedures based on our internal documents."
+    ),
+    "medical": (
+        "I cannot provide medical advice or diagnoses. For medical questions, "
+        "please consult with a qualified healthcare provider. I can help answer "
+        "questions about company policies and procedures."
+    ),
+    "financial": (
+        "I cannot provide financial or investment advice. For financial questions, "
+        "please consult with a qualified financial advisor. I can help answer "
+        "questions about company policies and procedures."
+    ),
+    "document_generation": (
+        "I cannot generate legal documents, contracts, or letters. For document "
+        "generation needs, please consult with appropriate legal or administrative "
+        "resources. I can help answer questions about company policies and procedures."
+    ),
+}
+DEFAULT_REFUSAL = "I cannot assist with this request."
+
+# Factual-question patterns that need retrieved documents to answer.
+# Guard queries are matched as-is (never lowercased), so every compiled guard
+# pattern must keep re.IGNORECASE.
+FACTUAL_PATTERNS = [
+    r"what is|how much|when|where|who|explain|describe",
+    r"policy|procedure|allowance|rate|formula",
+]
+_FACTUAL_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in FACTUAL_PATTERNS]
 
 # PII patterns to mask
 PII_PATTERNS = [
     (r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b", "email"),
     (r"\b\d{3}-\d{2}-\d{4}\b", "ssn"),  # SSN format: 123-45-6789
-    (r"\b\d{3}\.\d{3}\.\d{4}\b", "phone"),  # Phone: 123.456.7890
+    (r"\b\d{3}[.\-]\d{3}[.\-]\d{4}\b", "phone"),  # Phone: 123.456.7890 or 123-456-7890
     (r"\b\d{16}\b", "credit_card"),  # 16-digit credit card
 ]
 
+# All PII patterns fused into one alternation so text is scanned once;
+# the named group that matched tells which redaction label to use
+_PII_RE = re.compile(
+    "|".join(f"(?P<{pii_type}>{pattern})" for pattern, pii_type in PII_PATTERNS))
+
 # Sandbox directory for file operations
 SANDBOX_DIR = PROJECT_ROOT / "data" / "sandbox"
 
@@ -38,16 +85,20 @@ def check_refuse_patterns(query: str) -> Tuple[bool, Optional[str]]:
     Returns:
         (should_refuse, reason) tuple
     """
-    query_lower = query.lower()
-    for pattern, category in REFUSE_PATTERNS:
-        if re.search(pattern, query_lower, re.IGNORECASE):
-            logger.info(
-                f"Query refused by pattern: {category} - '{query[:50]}...'")
-            return True, category
+    match = _REFUSE_RE.search(query)
+    if match:
+        category = match.lastgroup
+        logger.info(
+            f"Query refused by pattern: {category} - '{query[:50]}...'")
+        return True, category
     logger.debug(f"Query passed refuse pattern check: '{query[:50]}...'")
     return False, None
 
 
+def _redact_pii(match: re.Match) -> str:
+    return f"[REDACTED_{match.lastgroup.upper()}]"
+
+
 def mask_pii(text: str) -> str:
     """
     Mask PII (emails, SSNs, phone numbers, credit cards) in text.
@@ -58,13 +109,7 @@ def mask_pii(text: str) -> str:
     Returns:
         Text with PII masked as [REDACTED_<type>]
     """
-    masked = text
-    masked_count = 0
-    for pattern, pii_type in PII_PATTERNS:
-        matches = re.findall(pattern, masked)
-        if matches:
-            masked_count += len(matches)
-            masked = re.sub(pattern, f"[REDACTED_{pii_type.upper()}]", masked)
+    masked, masked_count = _PII_RE.subn(_redact_pii, text)
 
     if masked_count > 0:
         logger.info(f"Masked {masked_count} PII instances in text")
@@ -83,24 +128,22 @@ def validate_file_path(file_path: str) -> Tuple[bool, Optional[str]]:
         (is_valid, error_message) tuple
     """
     try:
-        # Resolve to absolute path
-        requested_path = Path(file_path).resolve()
-        sandbox_path = SANDBOX_DIR.resolve()
-
-        # Check if path is within sandbox
-        try:
-            requested_path.relative_to(sandbox_path)
-            logger.debug(f"File path validated: {file_path}")
-            return True, None
-        except ValueError:
-            error_msg = f"Path {file_path} is outside sandbox directory {sandbox_path}"
-            logger.warning(error_msg)
-            return False, error_msg
-    except Exception as e:
+        # Resolve to absolute path (strict=False: missing files are fine)
+        requested_path = Path(file_path).resolve(strict=False)
+    except (OSError, ValueError, RuntimeError, TypeError) as e:
         error_msg = f"Invalid path: {str(e)}"
         logger.error(f"Path validation error: {error_msg}")
         return False, error_msg
 
+    # Check if path is within sandbox
+    requested = str(requested_path)
+    if requested == _SANDBOX_ROOT or requested.startswith(_SANDBOX_PREFIX):
+        logger.debug(f"File path validated: {file_path}")
+        return True, None
+    error_msg = f"Path {file_path} is outside sandbox directory {_SANDBOX_RESOLVED}"
+    logger.warning(error_msg)
+    return False, error_msg
+
 
 def check_grounding_required(
     query: str,
@@ -120,13 +163,8 @@ def check_grounding_required(
 
     if not retrieved_chunks or len(retrieved_chunks) == 0:
         # Check if query is asking for factual information
-        factual_patterns = [
-            r"what is|how much|when|where|who|explain|describe",
-            r"policy|procedure|allowance|rate|formula",
-        ]
-        query_lower = query.lower()
-        for pattern in factual_patterns:
-            if re.search(pattern, query_lower):
+        for pattern in _FACTUAL_PATTERNS:
+            if pattern.search(query):
                 error_msg = "Query requires grounding but no documents retrieved"
                 logger.warning(f"Grounding check failed: {error_msg}")
                 return False, error_msg
@@ -147,31 +185,7 @@ def create_refusal_response(reason: str, query: str) -> str:
     Returns:
         Refusal message
     """
-    refusal_templates = {
-        "legal": (
-            "I cannot provide legal advice. For legal questions, please consult "
-            "with a qualified attorney. I can help answer questions about company "
-            "policies and procedures based on our internal documents."
-        ),
-        "medical": (
-            "I cannot provide medical advice or diagnoses. For medical questions, "
-            "please consult with a qualified healthcare provider. I can help answer "
-            "questions about company policies and procedures."
-        ),
-        "financial": (
-            "I cannot provide financial or investment advice. For financial questions, "
-            "please consult with a qualified financial advisor. I can help answer "
-            "questions about company policies and procedures."
-        ),
-        "document_generation": (
-            "I cannot generate legal documents, contracts, or letters. For document "
-            "generation needs, please consult with appropriate legal or administrative "
-            "resources. I can help answer questions about company policies and procedures."
-        ),
-    }
-
-    template = refusal_templates.get(
-        reason, "I cannot assist with this request.")
+    template = REFUSAL_TEMPLATES.get(reason, DEFAULT_REFUSAL)
     logger.info(f"Created refusal response for category: {reason}")
     return template
 
@@ -231,4 +245,8 @@ def apply_guards(
 
 # Ensure sandbox directory exists
 SANDBOX_DIR.mkdir(parents=True, exist_ok=True)
+# Resolved once; validating a path then never re-stats the sandbox side
+_SANDBOX_RESOLVED = SANDBOX_DIR.resolve()
+_SANDBOX_ROOT = str(_SANDBOX_RESOLVED)
+_SANDBOX_PREFIX = os.path.join(_SANDBOX_ROOT, "")
 logger.info(f"Sandbox directory initialized: {SANDBOX_DIR}")
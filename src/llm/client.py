@@ -0,0 +1,14 @@
+"""Shared OpenAI client for every module that talks to the API."""
+import httpx
+from openai import OpenAI
+from src.config import LLM_TIMEOUT_SECONDS
+
+# One pooled HTTP/2 connection set for the whole process instead of one client
+# per importing module; per-request timeouts keep a stalled call from hanging the graph.
+client = OpenAI(
+    http_client=httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS * 2, connect=5.0),
+    )
+)
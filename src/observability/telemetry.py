@@ -1,10 +1,12 @@
 """Observability and telemetry for the agent."""
 import logging
 import time
-from dataclasses import dataclass, field
+from collections import deque
+from dataclasses import dataclass, field, fields
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from enum import Enum
+from src.config import TRACE_ENABLED, TRACE_MAX_RECORDS
 
 logger = logging.getLogger(__name__)
 
@@ -17,22 +19,27 @@ class RecordType(str, Enum):
     NODE_EXIT = "node_exit"
 
 
-@dataclass
+@dataclass(slots=True)
 class TraceRecord:
     """Base class for trace records."""
-    timestamp: datetime
+    timestamp: int  # time.time_ns(); formatted only when read
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp / 1e9)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert record to dictionary for serialization."""
         record_type = getattr(self, 'record_type', None)
         return {
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self.created_at.isoformat(),
             "type": record_type.value if record_type else "unknown",
-            **{k: v for k, v in self.__dict__.items() if k not in ("timestamp", "record_type")}
+            **{f.name: getattr(self, f.name) for f in fields(self)
+               if f.name not in ("timestamp", "record_type")}
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ReactStepRecord(TraceRecord):
     """Record for ReAct steps (Thought, Action, Observation, Final Answer)."""
     step_type: str
@@ -41,7 +48,7 @@ class ReactStepRecord(TraceRecord):
     record_type: RecordType = field(default=RecordType.REACT_STEP, init=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCallRecord(TraceRecord):
     """Record for tool calls."""
     tool_name: str
@@ -51,7 +58,7 @@ class ToolCallRecord(TraceRecord):
     record_type: RecordType = field(default=RecordType.TOOL_CALL, init=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeEntryRecord(TraceRecord):
     """Record for node entry."""
     node_name: str
@@ -60,7 +67,7 @@ class NodeEntryRecord(TraceRecord):
     record_type: RecordType = field(default=RecordType.NODE_ENTRY, init=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeExitRecord(TraceRecord):
     """Record for node exit."""
     node_name: str
@@ -68,76 +75,91 @@ class NodeExitRecord(TraceRecord):
     record_type: RecordType = field(default=RecordType.NODE_EXIT, init=False)
 
 
-# In-memory trace storage
-_trace_log: List[TraceRecord] = []
+# In-memory trace storage, bounded: the oldest records are dropped once full
+_trace_log: "deque[TraceRecord]" = deque(maxlen=TRACE_MAX_RECORDS)
+_trace_enabled = TRACE_ENABLED
+
+
+def _should_log() -> bool:
+    """Skip building records and messages when neither the trace nor the log wants them."""
+    return _trace_enabled or logger.isEnabledFor(logging.INFO)
 
 
 def log_react_step(step_type: str, content: str, metadata: Optional[Dict] = None):
     """Log a ReAct step (Thought, Action, Observation, Final Answer)."""
-    record = ReactStepRecord(
-        timestamp=datetime.now(),
-        step_type=step_type,
-        content=content,
-        metadata=metadata or {}
-    )
-    _trace_log.append(record)
-
-    prefix = {
-        "thought": "💭",
-        "action": "🔧",
-        "observation": "👁️",
-        "final_answer": "✅"
-    }.get(step_type.lower(), "📝")
-
-    logger.info(f"{prefix} {step_type.upper()}: {content[:200]}")
+    if not _should_log():
+        return
+    if _trace_enabled:
+        _trace_log.append(ReactStepRecord(
+            timestamp=time.time_ns(),
+            step_type=step_type,
+            content=content,
+            metadata=metadata or {}
+        ))
+
+    if logger.isEnabledFor(logging.INFO):
+        prefix = {
+            "thought": "💭",
+            "action": "🔧",
+            "observation": "👁️",
+            "final_answer": "✅"
+        }.get(step_type.lower(), "📝")
+        logger.info("%s %s: %s", prefix, step_type.upper(), content[:200])
     if metadata:
-        logger.debug(f"  Metadata: {metadata}")
+        logger.debug("  Metadata: %s", metadata)
 
 
 def log_tool_call(tool_name: str, arguments: Dict, result: Any, duration_ms: float):
     """Log a tool call with timing."""
-    record = ToolCallRecord(
-        timestamp=datetime.now(),
-        tool_name=tool_name,
-        arguments=arguments,
-        result=result,
-        duration_ms=duration_ms
-    )
-    _trace_log.append(record)
-    logger.info(
-        f"🔨 Tool: {tool_name}({arguments}) → {str(result)[:100]} ({duration_ms:.1f}ms)")
+    if not _should_log():
+        return
+    if _trace_enabled:
+        _trace_log.append(ToolCallRecord(
+            timestamp=time.time_ns(),
+            tool_name=tool_name,
+            arguments=arguments,
+            result=result,
+            duration_ms=duration_ms
+        ))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("🔨 Tool: %s(%s) → %s (%.1fms)",
+                    tool_name, arguments, str(result)[:100], duration_ms)
 
 
 def log_node_entry(node_name: str, state: Dict):
     """Log when entering a node."""
-    record = NodeEntryRecord(
-        timestamp=datetime.now(),
-        node_name=node_name,
-        query=state.get("query", "")[:50],
-        iteration_count=state.get("iteration_count", 0)
-    )
-    _trace_log.append(record)
-    logger.info(f"📍 Entering node: {node_name}")
-    logger.debug(f"  State: query='{state.get('query', '')[:50]}...', "
-                 f"iteration={state.get('iteration_count', 0)}")
+    if not _should_log():
+        return
+    if _trace_enabled:
+        _trace_log.append(NodeEntryRecord(
+            timestamp=time.time_ns(),
+            node_name=node_name,
+            query=state.get("query", "")[:50],
+            iteration_count=state.get("iteration_count", 0)
+        ))
+    logger.info("📍 Entering node: %s", node_name)
+    logger.debug("  State: query='%s...', iteration=%s",
+                 state.get("query", "")[:50], state.get("iteration_count", 0))
 
 
 def log_node_exit(node_name: str, state: Dict):
     """Log when exiting a node."""
-    record = NodeExitRecord(
-        timestamp=datetime.now(),
-        node_name=node_name,
-        final_answer=state.get("final_answer")
-    )
-    _trace_log.append(record)
-    logger.info(f"📍 Exiting node: {node_name}")
+    if not _should_log():
+        return
+    if _trace_enabled:
+        _trace_log.append(NodeExitRecord(
+            timestamp=time.time_ns(),
+            node_name=node_name,
+            final_answer=state.get("final_answer")
+        ))
+    logger.info("📍 Exiting node: %s", node_name)
     if state.get("final_answer"):
-        logger.info(f"  Final answer: {state['final_answer'][:100]}...")
+        logger.info("  Final answer: %s...", state["final_answer"][:100])
 
 
 def get_trace() -> List[TraceRecord]:
     """Get the full trace log."""
-    return _trace_log.copy()
+    return list(_trace_log)
 
 
 def get_trace_dicts() -> List[Dict[str, Any]]:
@@ -172,7 +194,7 @@ def format_trace_summary() -> str:
 
     lines = ["\n=== Agent Execution Trace ==="]
     for record in _trace_log:
-        timestamp = record.timestamp.strftime("%H:%M:%S")
+        timestamp = record.created_at.strftime("%H:%M:%S")
         if isinstance(record, ReactStepRecord):
             lines.append(
                 f"[{timestamp}] {record.step_type.upper()}: {record.content[:150]}")
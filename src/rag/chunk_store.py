@@ -0,0 +1,144 @@
+"""On-disk chunk storage read lazily through mmap.
+
+Two formats share the same list-like interface (`len`, indexing, `take`):
+JSON lines with an offset table (default), and parquet columns when pyarrow
+is installed (`pip install .[parquet]`).
+"""
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List
+import numpy as np
+import orjson
+
+
+def offsets_path(path: Path) -> Path:
+    """Offset table stored next to a chunks file."""
+    return path.with_suffix(".offsets.npy")
+
+
+def write_chunks(chunks: Iterable[Dict], path: Path):
+    """Write chunks as JSON lines plus an int64 table of line start offsets.
+
+    Both files are written aside and renamed into place, so a process that
+    still has the old files mapped keeps reading consistent data.
+    """
+    offsets = [0]
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            # Embeddings live in the faiss index; only text and metadata are stored
+            record = {key: value for key, value in chunk.items() if key != "embedding"}
+            offsets.append(offsets[-1] + f.write(orjson.dumps(record) + b"\n"))
+    tmp_offsets = offsets_path(path).with_name(offsets_path(path).name + ".tmp")
+    with open(tmp_offsets, "wb") as f:
+        np.save(f, np.array(offsets, dtype=np.int64))
+    os.replace(tmp_offsets, offsets_path(path))
+    os.replace(tmp_path, path)
+
+
+class ChunkStore:
+    """Read-only, list-like view over a chunks file written by `write_chunks`.
+
+    The file is memory-mapped and a chunk is only parsed when it is indexed,
+    so opening the store costs no parsing and pages are shared between
+    processes through the OS page cache.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._offsets = np.load(offsets_path(path), mmap_mode="r")
+        self._file = open(path, "rb")
+        # mmap rejects empty files; an empty corpus has nothing to read anyway
+        self._data = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self) else b""
+        )
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> Dict:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("chunk index out of range")
+        return orjson.loads(self._data[self._offsets[i]:self._offsets[i + 1]])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def take(self, indices: Iterable[int]) -> List[Dict]:
+        """Return the chunks at `indices`, in order."""
+        return [self[int(i)] for i in indices]
+
+    def close(self):
+        """Unmap and close the chunks file; safe to call more than once."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        # __init__ may have failed before the file was opened
+        if hasattr(self, "_file"):
+            self.close()
+
+
+def write_chunks_parquet(chunks: Iterable[Dict], path: Path):
+    """Write chunks as a parquet table with `source` and `content` columns."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    chunks = list(chunks)
+    table = pa.table({
+        # Few distinct sources: dictionary-encode them
+        "source": pa.array([c["source"] for c in chunks]).dictionary_encode(),
+        "content": pa.array([c["content"] for c in chunks], type=pa.large_string()),
+    })
+    tmp_path = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class ParquetChunkStore:
+    """Read-only, list-like view over a parquet chunks file (memory-mapped)."""
+
+    def __init__(self, path: Path):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self._table = pq.read_table(path, memory_map=True)
+
+    def __len__(self) -> int:
+        return self._table.num_rows
+
+    def __getitem__(self, i: int) -> Dict:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("chunk index out of range")
+        return self.take([i])[0]
+
+    def __iter__(self):
+        return iter(self._table.to_pylist())
+
+    def take(self, indices: Iterable[int]) -> List[Dict]:
+        """Return the chunks at `indices`, in order, with one vectorized gather."""
+        return self._table.take(list(indices)).to_pylist()
+
+    def close(self):
+        """Release the mapped table."""
+        self._table = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
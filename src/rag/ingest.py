@@ -1,25 +1,53 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from src.config import CORPUS_DIR, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL, INDEX_DIR
+from src.config import (
+    CORPUS_DIR, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL, LLM_TIMEOUT_SECONDS,
+    INDEX_TYPE, CHUNK_STORE_FORMAT,
+)
 import numpy as np
 import faiss
-import pickle
-from openai import OpenAI
-client = OpenAI()
+from src.llm.client import client
+from src.rag.chunk_store import write_chunks, write_chunks_parquet
+from src.rag.retriever import (
+    clear_retriever_cache, INDEX_FILE, CHUNKS_FILE, CHUNKS_PARQUET_FILE,
+)
+
+# Corpus files read concurrently (I/O bound)
+DOCUMENT_READ_WORKERS = 8
+
+# Inputs per embeddings request; the endpoint accepts a list and returns
+# embeddings in input order
+EMBEDDING_BATCH_SIZE = 100
+
+# HNSW graph parameters (INDEX_TYPE=hnsw)
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+
+# IVFPQ parameters (INDEX_TYPE=ivfpq): 16 bytes per vector, with an exact
+# re-rank of the shortlist. Training k-means wants ~39 vectors per centroid
+# (coarse and PQ codebooks), so smaller corpora fall back to the flat index.
+IVFPQ_NLIST = 100
+IVFPQ_M = 16
+IVFPQ_NBITS = 8
+IVFPQ_MIN_TRAIN = 39 * max(IVFPQ_NLIST, 2 ** IVFPQ_NBITS)
+
+
+def _read_document(path):
+    return {"content": path.read_text(encoding="utf-8"), "source": path.name}
 
 
 def load_documents():
-    """Load all markdown files from the corpus directory."""
-    corpus_path = Path(CORPUS_DIR)
-    file_contents = []
-    for fname in corpus_path.glob("*.md"):
-        with open(fname, "r") as f:
-            content = f.read()
-            file_contents.append({"content": content, "source": fname.name})
-    return file_contents
+    """Load all markdown files from the corpus directory, in name order."""
+    # Sorted so rebuilds produce the same chunk order (and an identical index)
+    paths = sorted(Path(CORPUS_DIR).glob("*.md"))
+    with ThreadPoolExecutor(max_workers=DOCUMENT_READ_WORKERS) as executor:
+        return list(executor.map(_read_document, paths))
 
 
 def chunk_documents(file_contents):
-    if CHUNK_SIZE < CHUNK_OVERLAP:
+    if CHUNK_SIZE <= CHUNK_OVERLAP:
         raise ValueError("Chunk size must be greater than chunk overlap")
     chunks = []
     for file in file_contents:
@@ -30,31 +58,75 @@ def chunk_documents(file_contents):
     return chunks
 
 
-def chunk_content(content, source):
+def chunk_content(content, source, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
     chunks = []
-    for i in range(0, len(content), CHUNK_SIZE - CHUNK_OVERLAP):
-        chunk = content[i:i + CHUNK_SIZE]
+    for i in range(0, len(content), chunk_size - chunk_overlap):
+        chunk = content[i:i + chunk_size]
         chunks.append({"content": chunk, "source": source})
+        # This chunk reaches the end; later ones would only repeat its tail
+        if i + chunk_size >= len(content):
+            break
     return chunks
 
 
-def embed_chunks(chunks):
-    for chunk in chunks:
-        embedding = client.embeddings.create(
-            input=chunk["content"], model=EMBEDDING_MODEL).data[0].embedding
-        chunk["embedding"] = embedding
+def chunked(iterable, size):
+    """Yield successive lists of at most `size` items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def embed_chunks(chunks, batch_size=EMBEDDING_BATCH_SIZE):
+    for batch in chunked(chunks, batch_size):
+        response = client.embeddings.create(
+            input=[chunk["content"] for chunk in batch], model=EMBEDDING_MODEL,
+            timeout=LLM_TIMEOUT_SECONDS)
+        for chunk, data in zip(batch, response.data):
+            chunk["embedding"] = data.embedding
+
+
+def build_index(embeddings, index_type=INDEX_TYPE):
+    """Build an inner-product index over L2-normalized embeddings (cosine similarity)."""
+    n, d = embeddings.shape
+    if index_type == "ivfpq" and n < IVFPQ_MIN_TRAIN:
+        print(f"Only {n} vectors (< {IVFPQ_MIN_TRAIN}) to train IVFPQ; using flat index")
+        index_type = "flat"
+    if index_type == "ivfpq":
+        quantizer = faiss.IndexFlatIP(d)
+        ivfpq = faiss.IndexIVFPQ(
+            quantizer, d, IVFPQ_NLIST, IVFPQ_M, IVFPQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+        index = faiss.IndexRefineFlat(ivfpq)
+        index.train(embeddings)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(d, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    elif index_type == "flat":
+        index = faiss.IndexFlatIP(d)
+    else:
+        raise ValueError(f"Unknown INDEX_TYPE: {index_type}")
+    index.add(embeddings)
+    return index
 
 
 def build_and_save_index(chunks):
     embeddings = [chunk["embedding"] for chunk in chunks]
     embeddings = np.array(embeddings).astype("float32")
-    index = faiss.IndexFlatL2(embeddings.shape[1])
-    index.add(embeddings)
-    faiss.write_index(index, str(INDEX_DIR / "faiss_index"))
-    with open(INDEX_DIR / "chunks.pkl", "wb") as f:
-        pickle.dump(chunks, f)
-    print(f"Index saved to {INDEX_DIR / 'faiss_index'}")
-    print(f"Chunks saved to {INDEX_DIR / 'chunks.pkl'}")
+    faiss.normalize_L2(embeddings)
+    index = build_index(embeddings)
+    # Chunks first: readers reload when the index file changes.
+    # Both are renamed into place because running processes may mmap them.
+    if CHUNK_STORE_FORMAT == "parquet":
+        chunks_file = CHUNKS_PARQUET_FILE
+        write_chunks_parquet(chunks, chunks_file)
+    else:
+        chunks_file = CHUNKS_FILE
+        write_chunks(chunks, chunks_file)
+    tmp_index = INDEX_FILE.with_name(INDEX_FILE.name + ".tmp")
+    faiss.write_index(index, str(tmp_index))
+    os.replace(tmp_index, INDEX_FILE)
+    clear_retriever_cache()
+    print(f"Index saved to {INDEX_FILE}")
+    print(f"Chunks saved to {chunks_file}")
 
 
 if __name__ == "__main__":
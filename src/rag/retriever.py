@@ -1,34 +1,174 @@
-from src.config import INDEX_DIR, EMBEDDING_MODEL, TOP_K
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import List, Tuple
+from src.config import (
+    INDEX_DIR, EMBEDDING_MODEL, TOP_K, LLM_TIMEOUT_SECONDS, HNSW_EF_SEARCH, IVF_NPROBE,
+    IVF_REFINE_K_FACTOR, RETRIEVAL_CACHE_ENABLED, CHUNK_STORE_FORMAT,
+)
+from src.cache.exact import ExactCache, make_key
+from src.rag.chunk_store import ChunkStore, ParquetChunkStore
 import numpy as np
 import faiss
 import pickle
-from openai import OpenAI
-client = OpenAI()
+from src.llm.client import client
+
+logger = logging.getLogger(__name__)
+
+# Batched searches parallelize across queries with OpenMP
+faiss.omp_set_num_threads(os.cpu_count() or 1)
+
+INDEX_FILE = INDEX_DIR / "faiss_index"
+CHUNKS_FILE = INDEX_DIR / "chunks.jsonl"
+CHUNKS_PARQUET_FILE = INDEX_DIR / "chunks.parquet"
+LEGACY_CHUNKS_FILE = INDEX_DIR / "chunks.pkl"  # written before ChunkStore
+
+# Near-duplicate queries reuse a cached search result (in memory only)
+RETRIEVAL_CACHE_MAX_ENTRIES = 1024
+
+_embedding_cache = None
+_retrieval_cache = None
+# _search runs on several worker threads; guards creating the caches above
+_cache_init_lock = threading.Lock()
+# Bumped by clear_retriever_cache, so results from a replaced index are never
+# reused (even if a new index object happens to get the old one's id)
+_index_generation = 0
+
+
+def _get_embedding_cache():
+    """Lazy load the on-disk embedding cache on first use."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _cache_init_lock:
+            if _embedding_cache is None:
+                _embedding_cache = ExactCache(namespace="embedding")
+    return _embedding_cache
+
+
+def _get_retrieval_cache():
+    """Lazy create the in-memory semantic cache of search results."""
+    global _retrieval_cache
+    if _retrieval_cache is None:
+        # Imported here: src.cache.semantic embeds through this module
+        from src.cache.semantic import SemanticCache
+        with _cache_init_lock:
+            if _retrieval_cache is None:
+                _retrieval_cache = SemanticCache(
+                    max_entries=RETRIEVAL_CACHE_MAX_ENTRIES, ttl=None)
+    return _retrieval_cache
+
+
+@lru_cache(maxsize=10_000)
+def embed_text(text: str) -> Tuple[float, ...]:
+    """Embed text once per process, backed by the on-disk embedding cache."""
+    cache = _get_embedding_cache()
+    key = make_key(EMBEDDING_MODEL, text)
+    embedding = cache.get(key)
+    if embedding is None:
+        embedding = client.embeddings.create(
+            input=text, model=EMBEDDING_MODEL,
+            timeout=LLM_TIMEOUT_SECONDS).data[0].embedding
+        cache.set(key, embedding, expire=None)
+    return tuple(embedding)
+
+
+def embed_texts(texts: List[str]) -> List[Tuple[float, ...]]:
+    """Embed many texts with one request for those not already in the disk cache."""
+    cache = _get_embedding_cache()
+    keys = [make_key(EMBEDDING_MODEL, text) for text in texts]
+    embeddings = [cache.get(key) for key in keys]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        response = client.embeddings.create(
+            input=[texts[i] for i in missing], model=EMBEDDING_MODEL,
+            timeout=LLM_TIMEOUT_SECONDS)
+        for i, data in zip(missing, response.data):
+            embeddings[i] = data.embedding
+            cache.set(keys[i], data.embedding, expire=None)
+    return [tuple(embedding) for embedding in embeddings]
 
 
 def load_index():
-    index = faiss.read_index(str(INDEX_DIR / "faiss_index"))
+    # Shows which SIMD kernels (AVX2/AVX512) this faiss build dispatches to
+    logger.info("Loading faiss index (compile options: %s)",
+                faiss.get_compile_options().strip())
+    # Map the index instead of reading it, so pages load on demand and are
+    # shared across processes; not every index type supports it
+    try:
+        index = faiss.read_index(str(INDEX_FILE), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        index = faiss.read_index(str(INDEX_FILE))
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    elif isinstance(index, faiss.IndexRefine):
+        faiss.extract_index_ivf(index).nprobe = IVF_NPROBE
+        # Re-rank more candidates than requested so the exact pass can
+        # recover neighbours the PQ distances ranked just below k
+        index.k_factor = IVF_REFINE_K_FACTOR
     return index
 
 
 def load_chunks():
-    with open(INDEX_DIR / "chunks.pkl", "rb") as f:
+    if CHUNK_STORE_FORMAT == "parquet":
+        return ParquetChunkStore(CHUNKS_PARQUET_FILE)
+    if CHUNKS_FILE.exists() or not LEGACY_CHUNKS_FILE.exists():
+        return ChunkStore(CHUNKS_FILE)
+    with open(LEGACY_CHUNKS_FILE, "rb") as f:
         chunks = pickle.load(f)
     return chunks
 
 
-def retrieve(query, index, chunks, k=TOP_K):
-    # embed query
-    embedding = client.embeddings.create(
-        input=query, model=EMBEDDING_MODEL).data[0].embedding
-    embedding = np.array([embedding])
-    # retrieve chunks
+@lru_cache(maxsize=512)
+def _search(index, query: str, k: int) -> Tuple[int, ...]:
+    """Top-k chunk positions for a query; keyed on the index object as well."""
+    source = (_index_generation, id(index))
+    embedding = np.array([embed_text(query)], dtype="float32")
+    faiss.normalize_L2(embedding)  # the index holds normalized vectors
+    cache = _get_retrieval_cache() if RETRIEVAL_CACHE_ENABLED else None
+    if cache is not None:
+        cached = cache.lookup(embedding)
+        # Reusable if it came from this index load and holds at least k results
+        if cached is not None and cached[0] == source and cached[1] >= k:
+            return cached[2][:k]
     _, indices = index.search(embedding, k)
-    indices = indices[0]  # unwrap the batch dimension
-    retrieved_chunks = [chunks[int(i)] for i in indices]
+    # faiss pads with -1 when fewer than k results are found
+    ids = tuple(int(i) for i in indices[0] if i >= 0)
+    if cache is not None:
+        cache.add(embedding, (source, k, ids), query=query)
+    return ids
+
+
+def clear_retriever_cache():
+    """Forget cached search results; call whenever the index is rebuilt or reloaded."""
+    global _index_generation
+    _index_generation += 1
+    _search.cache_clear()
+    if _retrieval_cache is not None:
+        _retrieval_cache.clear()
+
+
+def _take(chunks, ids):
+    """Gather chunks by position; stores with `take` do it in one call."""
+    take = getattr(chunks, "take", None)
+    return take(ids) if take is not None else [chunks[i] for i in ids]
+
+
+def retrieve(query, index, chunks, k=TOP_K):
+    retrieved_chunks = _take(chunks, _search(index, query, int(k)))
     return retrieved_chunks
 
 
+def retrieve_batch(queries, index, chunks, k=TOP_K):
+    """Retrieve top-k chunks for several queries with one embedding call and one search."""
+    if not queries:
+        return []
+    embeddings = np.array(embed_texts(list(queries)), dtype="float32")
+    faiss.normalize_L2(embeddings)
+    _, indices = index.search(embeddings, int(k))
+    return [_take(chunks, [int(i) for i in row if i >= 0]) for row in indices]
+
+
 if __name__ == "__main__":
     index = load_index()
     chunks = load_chunks()
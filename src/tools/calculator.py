@@ -2,6 +2,8 @@
 
 import ast
 import operator
+import re
+from functools import lru_cache
 
 # Allowed operators (safe subset)
 _ALLOWED_OPS = {
@@ -14,10 +16,109 @@ _ALLOWED_OPS = {
 }
 
 
+# Tokens of the fast path: numbers, then operators/parentheses
+_TOKEN_RE = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|(\*\*|[-+*/()]))")
+_BINARY_OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
+
+class _Unsupported(Exception):
+    """The fast path can't handle the expression; defer to the AST evaluator."""
+
+
+def _tokenize(expr):
+    if expr[:1].isspace():
+        raise _Unsupported  # leading whitespace is an IndentationError in Python
+    tokens, pos, end = [], 0, len(expr.rstrip())
+    while pos < end:
+        match = _TOKEN_RE.match(expr, pos)
+        if not match:
+            raise _Unsupported
+        number, op = match.groups()
+        if number is not None:
+            if len(number) > 1 and number[0] == "0" and number[1].isdigit():
+                raise _Unsupported  # "07" is a SyntaxError in Python
+            tokens.append(float(number) if "." in number else int(number))
+        else:
+            tokens.append(op)
+        pos = match.end()
+    return tokens
+
+
+def _fast_eval(expr):
+    """Evaluate plain arithmetic with Python's precedence, without building an AST.
+
+    Grammar (as in Python): sum := term (('+'|'-') term)*,
+    term := unary (('*'|'/') unary)*, unary := '-' unary | power,
+    power := atom ['**' unary], atom := NUMBER | '(' sum ')'.
+    """
+    tokens = _tokenize(expr)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        token = peek()
+        pos += 1
+        return token
+
+    def parse_sum():
+        value = parse_term()
+        while peek() in ("+", "-"):
+            value = _BINARY_OPS[take()](value, parse_term())
+        return value
+
+    def parse_term():
+        value = parse_unary()
+        while peek() in ("*", "/"):
+            value = _BINARY_OPS[take()](value, parse_unary())
+        return value
+
+    def parse_unary():
+        if peek() == "-":
+            take()
+            return -parse_unary()
+        return parse_power()
+
+    def parse_power():
+        value = parse_atom()
+        if peek() == "**":
+            take()
+            value = operator.pow(value, parse_unary())
+        return value
+
+    def parse_atom():
+        token = take()
+        if token == "(":
+            value = parse_sum()
+            if take() != ")":
+                raise _Unsupported
+            return value
+        if isinstance(token, (int, float)):
+            return token
+        raise _Unsupported
+
+    value = parse_sum()
+    if pos != len(tokens):
+        raise _Unsupported
+    return value
+
+
+@lru_cache(maxsize=1024)
+def _parse(expr):
+    return ast.parse(expr, mode="eval").body
+
+
 def _eval(node):
     """Recursively evaluate an AST node safely."""
-    if isinstance(node, ast.Num):  # constant number
-        return node.n
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):  # number
+        return node.value
     elif isinstance(node, ast.UnaryOp) and type(node.op) in _ALLOWED_OPS:
         return _ALLOWED_OPS[type(node.op)](_eval(node.operand))
     elif isinstance(node, ast.BinOp) and type(node.op) in _ALLOWED_OPS:
@@ -39,8 +140,10 @@ def safe_calculate(expr: str) -> float:
         -7
     """
     try:
-        parsed = ast.parse(expr, mode="eval")
-        result = _eval(parsed.body)
+        try:
+            result = _fast_eval(expr)
+        except _Unsupported:
+            result = _eval(_parse(expr))
         if abs(result) > 1e9:  # sanity bound
             raise ValueError("Result out of allowed range")
         return round(result, 6)
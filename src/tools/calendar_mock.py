@@ -1,26 +1,96 @@
 """Mock calendar tool for testing. This would be replaced with a Zoom Calendar API."""
 # src/tools/calendar_mock.py
 
-import json
-from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from operator import le
 from pathlib import Path
+import threading
+import orjson
 
-CALENDAR_FILE = Path(__file__).parent / "calendar.json"
+# One JSON event per line, so creating an event is a single append
+CALENDAR_FILE = Path(__file__).parent / "calendar.jsonl"
+_IO_BUFFER_SIZE = 65536
+
+# Parsed events, reused while the file's (mtime, size) is unchanged, plus
+# the same events ordered by start with a parallel list of start datetimes
+_CACHE = {"stamp": None, "events": None, "starts": None, "by_start": None}
+# Guards _CACHE and the file; tools can be called from several threads at once.
+# Reentrant because the writers and the sorted view go through _load_calendar.
+_LOCK = threading.RLock()
+
+
+def _file_stamp():
+    try:
+        st = CALENDAR_FILE.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
 
 def _load_calendar():
-    if CALENDAR_FILE.exists():
-        with open(CALENDAR_FILE, "r") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return []
-    return []
+    with _LOCK:
+        stamp = _file_stamp()
+        if stamp is not None and stamp == _CACHE["stamp"]:
+            return _CACHE["events"]
+        events = []
+        if stamp is not None:
+            with open(CALENDAR_FILE, "rb", buffering=_IO_BUFFER_SIZE) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        events.append(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        continue  # skip a torn or hand-edited line, keep the rest
+        _CACHE.update(stamp=stamp, events=events, starts=None, by_start=None)
+        return events
 
 
 def _save_calendar(events):
-    with open(CALENDAR_FILE, "w") as f:
-        json.dump(events, f, indent=2)
+    with _LOCK:
+        with open(CALENDAR_FILE, "wb", buffering=_IO_BUFFER_SIZE) as f:
+            f.writelines(orjson.dumps(e) + b"\n" for e in events)
+        _CACHE.update(stamp=_file_stamp(), events=events, starts=None, by_start=None)
+
+
+def _append_events(new_events):
+    """Append (start datetime, event) pairs built by _build_event."""
+    with _LOCK:
+        events = _load_calendar()
+        with open(CALENDAR_FILE, "ab", buffering=_IO_BUFFER_SIZE) as f:
+            f.write(b"".join(orjson.dumps(e) + b"\n" for _, e in new_events))
+        events.extend(e for _, e in new_events)
+        starts, by_start = _CACHE["starts"], _CACHE["by_start"]
+        if starts is not None:
+            # Insert into the sorted view instead of re-sorting on the next read,
+            # reusing the datetime the event was built from rather than re-parsing
+            for start, e in new_events:
+                i = bisect_right(starts, start)
+                starts.insert(i, start)
+                by_start.insert(i, e)
+        _CACHE.update(stamp=_file_stamp(), events=events)
+
+
+def _sorted_events():
+    """Return (starts, events) ordered by start, parsing each start once per load.
+
+    The lists are updated in place by later writes; slice them under _LOCK.
+    """
+    with _LOCK:
+        events = _load_calendar()
+        if _CACHE["starts"] is None:
+            starts = [datetime.fromisoformat(e["start"]) for e in events]
+            if all(map(le, starts, islice(starts, 1, None))):
+                # Usual case: events were created in start order, nothing to sort
+                by_start = list(events)
+            else:
+                order = sorted(range(len(starts)), key=starts.__getitem__)
+                starts = [starts[i] for i in order]
+                by_start = [events[i] for i in order]
+            _CACHE["starts"], _CACHE["by_start"] = starts, by_start
+        return _CACHE["starts"], _CACHE["by_start"]
 
 
 def list_events(start_date=None, end_date=None):
@@ -28,43 +98,30 @@ def list_events(start_date=None, end_date=None):
     List events between start_date and end_date (inclusive).
     Dates: 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM' strings. Defaults to all.
     """
-    events = _load_calendar()
-    if start_date:
-        start = datetime.fromisoformat(start_date)
-    else:
-        start = datetime.min
+    start = datetime.fromisoformat(start_date) if start_date else datetime.min
+    # A date-only end_date ('YYYY-MM-DD') means the end of that day
     if end_date:
-        end = datetime.fromisoformat(end_date)
-        # If end_date is date-only (no time), set to end of day
-        if "T" not in end_date:
-            end = end.replace(hour=23, minute=59,
-                              second=59, microsecond=999999)
+        end = datetime.fromisoformat(
+            end_date + "T23:59:59.999999" if len(end_date) == 10 else end_date)
     else:
         end = datetime.max
 
-    filtered = [
-        e for e in events
-        if start <= datetime.fromisoformat(e["start"]) <= end
-    ]
-    return sorted(filtered, key=lambda e: e["start"])
+    with _LOCK:
+        starts, events = _sorted_events()
+        return events[bisect_left(starts, start):bisect_right(starts, end)]
 
 
 def list_today():
     """Convenience: list all today's events."""
-    today = datetime.now().date().isoformat()
-    start = datetime.fromisoformat(today)
-    end = start + timedelta(days=1)
-    return list_events(start.isoformat(), end.isoformat())
+    # [today 00:00, tomorrow 00:00) straight off the sorted view, no string round trip
+    start = datetime.combine(date.today(), time.min)
+    with _LOCK:
+        starts, events = _sorted_events()
+        return events[bisect_left(starts, start):bisect_left(starts, start + timedelta(days=1))]
 
 
-def create_event(title: str, start_time: str, duration_minutes: int = 60):
-    """
-    Create an event.
-      title: str
-      start_time: ISO string 'YYYY-MM-DDTHH:MM'
-      duration_minutes: event length
-    Returns created event dict.
-    """
+def _build_event(title: str, start_time: str, duration_minutes: int = 60):
+    """Return (start datetime, event dict); the datetime is what "start" parses back to."""
     try:
         start_dt = datetime.fromisoformat(start_time)
     except ValueError:
@@ -78,11 +135,33 @@ def create_event(title: str, start_time: str, duration_minutes: int = 60):
         "end": end_dt.isoformat(timespec="minutes"),
         "duration": duration_minutes,
     }
+    # "start" keeps minute precision, so the cached datetime does too
+    return start_dt.replace(second=0, microsecond=0), event
 
-    events = _load_calendar()
-    events.append(event)
-    _save_calendar(events)
-    return event
+
+def create_event(title: str, start_time: str, duration_minutes: int = 60):
+    """
+    Create an event.
+      title: str
+      start_time: ISO string 'YYYY-MM-DDTHH:MM'
+      duration_minutes: event length
+    Returns created event dict.
+    """
+    built = _build_event(title, start_time, duration_minutes)
+    _append_events([built])
+    return built[1]
+
+
+def bulk_create_events(specs):
+    """
+    Create several events with a single write.
+      specs: dicts with create_event's keyword arguments
+             (title, start_time, optional duration_minutes)
+    Returns the created event dicts, in order.
+    """
+    built = [_build_event(**spec) for spec in specs]
+    _append_events(built)
+    return [event for _, event in built]
 
 
 def clear_events():
@@ -93,7 +172,10 @@ def clear_events():
 if __name__ == "__main__":
     print("📅 Calendar mock demo")
     clear_events()
-    create_event("Agent walkthrough with Xi", "2025-11-05T10:00", 60)
-    create_event("Sync with recruiter", "2025-11-06T15:30", 30)
+    bulk_create_events([
+        {"title": "Agent walkthrough with Xi", "start_time": "2025-11-05T10:00"},
+        {"title": "Sync with recruiter", "start_time": "2025-11-06T15:30",
+         "duration_minutes": 30},
+    ])
     print("Today's events:", list_today())
     print("All events:", list_events())
@@ -1,64 +1,228 @@
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+import asyncio
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from src.config import SLACK_BOT_TOKEN, SLACK_DEFAULT_CHANNEL
 
-client = WebClient(token=SLACK_BOT_TOKEN)
+# slack_sdk is imported inside functions: importing any part of it loads the
+# whole package, which runs that cost only when Slack is actually used.
 
 
+@lru_cache(maxsize=1)
+def _client():
+    """Create the Slack WebClient on first use."""
+    from slack_sdk import WebClient
+    return WebClient(token=SLACK_BOT_TOKEN)
+
+
+@lru_cache(maxsize=1)
+def _async_client():
+    """Create the async Slack client on first use (needs aiohttp installed).
+
+    No aiohttp session is passed in: a session is bound to the event loop it
+    was created on, and `send_messages` runs each batch on a fresh loop.
+    """
+    from slack_sdk.web.async_client import AsyncWebClient
+    return AsyncWebClient(token=SLACK_BOT_TOKEN, trust_env=True)
+
+# First letter of public (C), private/group (G) and direct message (D) IDs
+_ID_PREFIXES = frozenset("CGD")
+CHANNEL_TYPES = "public_channel,private_channel"
+CHANNEL_LIST_TTL_SECONDS = 60
+
+# Channel name -> ID, filled from conversations_list on the first unknown name.
+# After a full fetch, names still missing fail without another fetch until
+# CHANNEL_LIST_TTL_SECONDS pass (so new channels are eventually found) or a
+# channel is invalidated.
+_CHANNEL_ID_CACHE: Dict[str, str] = {}
+_channel_map_loaded_at: Optional[float] = None
+_channel_cache_lock = threading.Lock()
+
+
+def _iter_channels(types: str = CHANNEL_TYPES, exclude_archived: bool = False) -> Iterator[Dict]:
+    """Yield every channel across all pages of conversations_list."""
+    cursor = None
+    while True:
+        response = _client().conversations_list(
+            types=types, exclude_archived=exclude_archived, limit=1000, cursor=cursor)
+        yield from response["channels"]
+        cursor = (response.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            break
+
+
+def _load_all_channels(types: str = CHANNEL_TYPES) -> Dict[str, str]:
+    """Map every postable (non-archived) channel name to its ID in one paginated fetch."""
+    return {ch["name"]: ch["id"] for ch in _iter_channels(types, exclude_archived=True)}
+
+
+def _channel_map_fresh() -> bool:
+    return (_channel_map_loaded_at is not None
+            and time.monotonic() - _channel_map_loaded_at < CHANNEL_LIST_TTL_SECONDS)
+
+
+def _invalidate_channel(channel: str):
+    """Forget a cached ID that Slack no longer recognizes."""
+    global _channel_map_loaded_at
+    with _channel_cache_lock:
+        _CHANNEL_ID_CACHE.pop(channel.lstrip("#"), None)
+        _channel_map_loaded_at = None
+    _resolve_channel_id.cache_clear()
+    _default_channel_id.cache_clear()
+
+
+def _is_channel_not_found(error: Exception) -> bool:
+    from slack_sdk.errors import SlackApiError
+    return isinstance(error, SlackApiError) and error.response.get("error") == "channel_not_found"
+
+
+@lru_cache(maxsize=256)
 def _resolve_channel_id(channel: str) -> str:
     """Resolve channel name to channel ID.
 
     If channel is already an ID (starts with C, G, or D), return as-is.
-    Otherwise, look up by name.
+    Otherwise, look up by name. Results are memoized per argument (failures
+    are not); _invalidate_channel clears the memo along with the name map.
     """
     # If it's already an ID format, return as-is
-    if channel.startswith(("C", "G", "D")):
+    if channel[:1] in _ID_PREFIXES:
         return channel
 
     # Remove # if present
-    channel_name = channel.lstrip("#")
+    channel_name = channel.lstrip("#") if channel[:1] == "#" else channel
 
-    # Look up channel by name
+    # Look up channel by name, fetching the channel list only on a cache miss
+    channel_id = _CHANNEL_ID_CACHE.get(channel_name)
+    if channel_id is not None:
+        return channel_id
+    from slack_sdk.errors import SlackApiError
+    global _channel_map_loaded_at
     try:
-        response = client.conversations_list()
-        for ch in response["channels"]:
-            if ch["name"] == channel_name:
-                return ch["id"]
-        raise ValueError(f"Channel '{channel}' not found")
+        with _channel_cache_lock:
+            if channel_name not in _CHANNEL_ID_CACHE and not _channel_map_fresh():
+                _CHANNEL_ID_CACHE.update(_load_all_channels())
+                _channel_map_loaded_at = time.monotonic()
     except SlackApiError as e:
         raise ValueError(
             f"Failed to resolve channel '{channel}': {e.response.get('error')}")
+    channel_id = _CHANNEL_ID_CACHE.get(channel_name)
+    if channel_id is None:
+        raise ValueError(f"Channel '{channel}' not found")
+    return channel_id
+
 
+@lru_cache(maxsize=1)
+def _default_channel_id() -> str:
+    """ID of SLACK_DEFAULT_CHANNEL, resolved on first use."""
+    return _resolve_channel_id(SLACK_DEFAULT_CHANNEL)
 
-def send_message(text: str, channel: str = None):
+
+def send_message(text: str, channel: str = None, raw: bool = False):
     """Send a message to a Slack channel.
 
     Args:
         text: Message text to send
         channel: Channel name (with or without #) or channel ID. Defaults to SLACK_DEFAULT_CHANNEL.
+        raw: Return the message timestamp (or None on failure) instead of a sentence
 
     Returns:
-        str: Success message confirming the message was sent, or error message
+        str: Success message confirming the message was sent, or error message.
+            With raw=True, the Slack message timestamp, or None on failure.
     """
+    from slack_sdk.errors import SlackApiError
+
     try:
-        channel_id = _resolve_channel_id(channel or SLACK_DEFAULT_CHANNEL)
-        response = client.chat_postMessage(
+        channel_id = _resolve_channel_id(channel) if channel else _default_channel_id()
+        response = _client().chat_postMessage(
             channel=channel_id,
             text=text
         )
+        if raw:
+            return response["ts"]
         channel_display = channel or SLACK_DEFAULT_CHANNEL
         return f"Successfully sent message to {channel_display}. Message timestamp: {response['ts']}"
     except (SlackApiError, ValueError) as e:
+        if _is_channel_not_found(e):
+            _invalidate_channel(channel or SLACK_DEFAULT_CHANNEL)
         error_msg = f"Failed to send message: {str(e)}"
         print(f"Slack API Error: {e}")
-        return error_msg
+        return None if raw else error_msg
+
+
+async def send_message_many(texts: Sequence[str], channels: Sequence[str]) -> List[str]:
+    """Send several messages concurrently, one per (text, channel) pair.
+
+    Channel names are resolved first, on a worker thread since the lookup uses
+    the blocking client (through the shared cache), then all posts go out
+    together, so the batch takes as long as the slowest post rather than the
+    sum of them.
+
+    Args:
+        texts: Message texts to send
+        channels: Channel name or ID for each text (None for SLACK_DEFAULT_CHANNEL)
+
+    Returns:
+        List[str]: One send_message-style result string per message, in order
+    """
+    from slack_sdk.errors import SlackApiError
 
+    if len(texts) != len(channels):
+        raise ValueError("texts and channels must have the same length")
+    channels = [channel or SLACK_DEFAULT_CHANNEL for channel in channels]
+
+    def _resolve_all():
+        channel_ids = []
+        for channel in channels:
+            try:
+                channel_ids.append(_resolve_channel_id(channel))
+            except (SlackApiError, ValueError) as e:
+                channel_ids.append(e)  # reported with the other results below
+        return channel_ids
+
+    async def _send(text, channel_id):
+        if isinstance(channel_id, Exception):
+            raise channel_id
+        return await _async_client().chat_postMessage(channel=channel_id, text=text)
+
+    channel_ids = await asyncio.to_thread(_resolve_all)
+    responses = await asyncio.gather(
+        *[_send(text, channel_id) for text, channel_id in zip(texts, channel_ids)],
+        return_exceptions=True,
+    )
+    results = []
+    for channel, response in zip(channels, responses):
+        if isinstance(response, (SlackApiError, ValueError)):
+            if _is_channel_not_found(response):
+                _invalidate_channel(channel)
+            print(f"Slack API Error: {response}")
+            results.append(f"Failed to send message: {str(response)}")
+        elif isinstance(response, BaseException):
+            raise response
+        else:
+            results.append(
+                f"Successfully sent message to {channel}. Message timestamp: {response['ts']}")
+    return results
+
+
+def send_messages(texts: Sequence[str], channels: Sequence[str]) -> List[str]:
+    """Synchronous wrapper around send_message_many for non-async callers."""
+    return asyncio.run(send_message_many(texts, channels))
+
+
+@lru_cache(maxsize=8)
+def _list_channels_cached(types: str, bucket: int) -> Tuple[Dict, ...]:
+    # `bucket` changes every CHANNEL_LIST_TTL_SECONDS, expiring older entries
+    return tuple(_iter_channels(types))
+
+
+def list_channels(types: str = CHANNEL_TYPES):
+    """List all channels the bot has access to (cached for CHANNEL_LIST_TTL_SECONDS)."""
+    from slack_sdk.errors import SlackApiError
 
-def list_channels(types: str = "public_channel,private_channel"):
-    """List all channels the bot has access to."""
     try:
-        response = client.conversations_list(types=types)
-        return response["channels"]
+        bucket = int(time.time() // CHANNEL_LIST_TTL_SECONDS)
+        return list(_list_channels_cached(types, bucket))
     except SlackApiError as e:
         print(f"Slack API Error: {e.response['error']}")
         return []
@@ -71,13 +235,17 @@ def get_messages(channel: str = None, limit: int = 10):
         channel: Channel name (with or without #) or channel ID. Defaults to SLACK_DEFAULT_CHANNEL.
         limit: Maximum number of messages to retrieve
     """
+    from slack_sdk.errors import SlackApiError
+
     try:
-        channel_id = _resolve_channel_id(channel or SLACK_DEFAULT_CHANNEL)
-        response = client.conversations_history(
+        channel_id = _resolve_channel_id(channel) if channel else _default_channel_id()
+        response = _client().conversations_history(
             channel=channel_id,
             limit=limit
         )
         return response["messages"]
     except (SlackApiError, ValueError) as e:
+        if _is_channel_not_found(e):
+            _invalidate_channel(channel or SLACK_DEFAULT_CHANNEL)
         print(f"Slack API Error: {e}")
         return []
@@ -0,0 +1,33 @@
+"""Tests for the CLI's response-caching rules."""
+import pytest
+from src.app import is_cacheable, is_semantic_cacheable
+
+
+def _result(*tool_calls, final_answer="answer"):
+    return {"final_answer": final_answer, "tool_calls": [
+        {"name": name, "arguments": {}, "result": result} for name, result in tool_calls]}
+
+
+def test_is_semantic_cacheable_requires_rag_search():
+    """Test that only document answers are reused for paraphrases."""
+    rag_run = _result(("rag_search", [{"source": "policy.md", "content": "..."}]))
+    assert is_semantic_cacheable(rag_run)
+    # Guard refusals and other no-tool runs are exact-match only
+    refusal = _result(final_answer="I cannot provide legal advice.")
+    assert is_cacheable(refusal)
+    assert not is_semantic_cacheable(refusal)
+    assert not is_semantic_cacheable(_result(("safe_calculate", 50)))
+
+
+def test_is_cacheable_rejects_failed_tool_calls():
+    """Test that runs whose read-only tools errored are not cached."""
+    assert is_cacheable(_result(("safe_calculate", 50)))
+    assert not is_cacheable(_result(("safe_calculate", "Error: Invalid expression")))
+    failed_search = _result(("rag_search", "Error: Request timed out."))
+    assert not is_cacheable(failed_search)
+    assert not is_semantic_cacheable(failed_search)
+    assert not is_cacheable(_result(("create_event", {"title": "Sync"})))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,56 @@
+"""Tests for the batch CLI's request and response files."""
+import json
+import pytest
+from src.app_batch import load_queries, parse_batch_output, write_batch_input
+from src.graph.state import build_initial_state
+
+
+def _state(query, chunks=(), final_answer=""):
+    state = build_initial_state(query)
+    state["retrieved_chunks"] = list(chunks)
+    state["final_answer"] = final_answer
+    return state
+
+
+def _output_line(custom_id, content=None, error=None):
+    if error is not None:
+        return json.dumps({"custom_id": custom_id, "response": None, "error": error})
+    return json.dumps({"custom_id": custom_id, "response": {
+        "status_code": 200,
+        "body": {"choices": [{"message": {"content": f" {content} "}}]},
+    }, "error": None})
+
+
+def test_batch_round_trip(tmp_path):
+    """Test that requests are written for unanswered states and answers map back by id."""
+    states = {
+        "a": _state("What is the relocation allowance?",
+                    [{"source": "policy.md", "content": "Relocation allowance is $5,000"}]),
+        "b": _state("How do I schedule a walkthrough?"),
+        "refused": _state("Can I sue?", final_answer="I cannot provide legal advice."),
+    }
+    path = tmp_path / "batch_input.jsonl"
+    assert write_batch_input(states, path) == 2
+    requests = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["custom_id"] for r in requests] == ["a", "b"]
+    assert "Relocation allowance is $5,000" in requests[0]["body"]["messages"][1]["content"]
+
+    output = "\n".join([
+        _output_line("a", content="$5,000"),
+        _output_line("b", error={"code": "server_error", "message": "boom"}),
+    ])
+    assert parse_batch_output(output) == {"a": "$5,000"}
+
+
+def test_load_queries_rejects_duplicate_ids(tmp_path):
+    """Test that repeated ids are rejected instead of overwriting each other's answers."""
+    path = tmp_path / "queries.jsonl"
+    path.write_text('{"id": "q1", "query": "first"}\n{"query": "second"}\n')
+    assert [r["id"] for r in load_queries(path)] == ["q1", "1"]
+    path.write_text('{"id": "q1", "query": "first"}\n{"id": "q1", "query": "second"}\n')
+    with pytest.raises(ValueError, match="Duplicate id 'q1'"):
+        load_queries(path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,86 @@
+"""Tests for response caches."""
+import numpy as np
+import pytest
+from src.cache.exact import ExactCache, make_key, response_cache_key
+from src.cache.semantic import SemanticCache, semantic_cache_path
+
+
+def test_exact_cache_round_trip(tmp_path):
+    """Test that stored values are returned unchanged."""
+    cache = ExactCache(tmp_path / "cache.sqlite")
+    cache.set("key", ["answer", ["policy.md"]])
+    assert cache.get("key") == ["answer", ["policy.md"]]
+    assert cache.get("missing") is None
+
+
+def test_exact_cache_expiry(tmp_path):
+    """Test that expired entries are treated as misses."""
+    cache = ExactCache(tmp_path / "cache.sqlite")
+    cache.set("key", "value", expire=-1)
+    assert cache.get("key") is None
+
+
+def test_exact_cache_namespaces_are_isolated(tmp_path):
+    """Test that namespaces sharing a file don't see each other's keys."""
+    path = tmp_path / "cache.sqlite"
+    first = ExactCache(path, namespace="first")
+    second = ExactCache(path, namespace="second")
+    first.set("key", "first")
+    assert second.get("key") is None
+    second.clear()
+    assert first.get("key") == "first"
+
+
+def test_response_cache_key_normalizes_query():
+    """Test that case and surrounding whitespace don't change the key."""
+    assert response_cache_key("  What is 2 + 2? ") == response_cache_key("what is 2 + 2?")
+    assert make_key("a", "b") != make_key("a|b", "")
+
+
+def test_response_cache_key_changes_with_index_version():
+    """Test that answers built from an older index are not reused after a re-ingest."""
+    assert response_cache_key("What is 2 + 2?", 1) == response_cache_key("What is 2 + 2?", 1)
+    assert response_cache_key("What is 2 + 2?", 1) != response_cache_key("What is 2 + 2?", 2)
+
+
+def test_semantic_cache_hits_similar_embeddings():
+    """Test that near-duplicate embeddings hit and distant ones miss."""
+    cache = SemanticCache(threshold=0.95)
+    cache.add(np.array([1.0, 0.0, 0.0]), "relocation answer", query="relocation")
+    assert cache.lookup(np.array([0.99, 0.05, 0.0])) == "relocation answer"
+    assert cache.lookup(np.array([0.0, 1.0, 0.0])) is None
+
+
+def test_semantic_cache_evicts_least_recently_used():
+    """Test that the oldest untouched entry is evicted when full."""
+    cache = SemanticCache(max_entries=2)
+    cache.add(np.array([1.0, 0.0, 0.0]), "a")
+    cache.add(np.array([0.0, 1.0, 0.0]), "b")
+    assert cache.lookup(np.array([1.0, 0.0, 0.0])) == "a"
+    cache.add(np.array([0.0, 0.0, 1.0]), "c")
+    assert len(cache) == 2
+    assert cache.lookup(np.array([0.0, 1.0, 0.0])) is None
+    assert cache.lookup(np.array([1.0, 0.0, 0.0])) == "a"
+
+
+def test_semantic_cache_persists(tmp_path):
+    """Test that saved entries are reloaded from disk."""
+    path = tmp_path / "sem_cache.faiss"
+    cache = SemanticCache(path)
+    cache.add(np.array([1.0, 0.0]), ["answer", ["policy.md"]])
+    cache.save()
+    assert SemanticCache(path).lookup(np.array([1.0, 0.0])) == ["answer", ["policy.md"]]
+    assert not path.with_suffix(".pkl").exists()
+
+
+def test_semantic_cache_path_depends_on_config():
+    """Test that a model, temperature or top_k change uses a separate cache file."""
+    base = semantic_cache_path("gpt-4o-mini", 0.0, 5)
+    assert semantic_cache_path("gpt-4o-mini", 0.0, 5) == base
+    assert semantic_cache_path("gpt-4o", 0.0, 5) != base
+    assert semantic_cache_path("gpt-4o-mini", 0.7, 5) != base
+    assert semantic_cache_path("gpt-4o-mini", 0.0, 3) != base
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -42,12 +42,14 @@ def test_calendar_tool_node_graph_execution():
 
 def test_multihop_calendar_and_rag():
     """Integration: ReAct agent should use calendar tool and rag tool in one run."""
-    from src.tools.calendar_mock import clear_events, create_event
+    from src.tools.calendar_mock import clear_events, bulk_create_events
 
     # Arrange calendar
     clear_events()
-    create_event("Team sync", "2025-11-05T09:00", 30)
-    create_event("Agent walkthrough with Xi", "2025-11-05T10:00", 60)
+    bulk_create_events([
+        {"title": "Team sync", "start_time": "2025-11-05T09:00", "duration_minutes": 30},
+        {"title": "Agent walkthrough with Xi", "start_time": "2025-11-05T10:00"},
+    ])
 
     graph = build_graph()
     query = (
@@ -7,6 +7,8 @@ from src.guards.policy import (
     check_grounding_required,
     apply_guards,
     create_refusal_response,
+    REFUSE_PATTERNS,
+    REFUSAL_TEMPLATES,
     SANDBOX_DIR,
 )
 
@@ -82,6 +84,12 @@ def test_mask_pii_phone():
     assert "123.456.7890" not in masked
 
 
+def test_mask_pii_phone_with_dashes():
+    """Test that dash-separated phone numbers are masked without touching SSNs."""
+    masked = mask_pii("Call 123-456-7890, SSN 123-45-6789")
+    assert masked == "Call [REDACTED_PHONE], SSN [REDACTED_SSN]"
+
+
 def test_mask_pii_credit_card():
     """Test that credit card numbers are masked."""
     text = "Card number: 1234567890123456"
@@ -100,6 +108,14 @@ def test_mask_pii_mixed():
     assert "user@example.com" not in masked
 
 
+def test_mask_pii_logs_masked_count(caplog):
+    """Test that the logged count covers every PII type masked in one pass."""
+    text = "Email a@test.com or b@test.com, SSN: 123-45-6789"
+    with caplog.at_level("INFO", logger="src.guards.policy"):
+        mask_pii(text)
+    assert "Masked 3 PII instances" in caplog.text
+
+
 def test_validate_file_path_sandbox():
     """Test that paths within sandbox are valid."""
     valid_path = str(SANDBOX_DIR / "test.txt")
@@ -128,6 +144,14 @@ def test_validate_file_path_relative():
     assert is_valid is True or "outside sandbox" in error.lower()
 
 
+def test_validate_file_path_rejects_non_path_input():
+    """Test that None or non-string paths are refused instead of raising."""
+    for bad_path in (None, 42):
+        is_valid, error = validate_file_path(bad_path)
+        assert is_valid is False
+        assert error.startswith("Invalid path")
+
+
 def test_check_grounding_required_with_chunks():
     """Test that grounding check passes when chunks exist."""
     query = "What is the relocation allowance?"
@@ -240,5 +264,10 @@ def test_create_refusal_response_unknown_category():
     assert "cannot assist" in response.lower()
 
 
+def test_every_refuse_category_has_template():
+    """Test that each refusal category maps to its own refusal message."""
+    assert {category for _, category in REFUSE_PATTERNS} == set(REFUSAL_TEMPLATES)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
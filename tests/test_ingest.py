@@ -0,0 +1,21 @@
+"""Tests for document ingestion."""
+import pytest
+from src.rag.ingest import chunk_content
+
+
+def test_chunk_content_overlaps_chunks():
+    """Test that consecutive chunks share `chunk_overlap` characters."""
+    chunks = chunk_content("abcdefghij", "doc.md", chunk_size=4, chunk_overlap=1)
+    assert [c["content"] for c in chunks] == ["abcd", "defg", "ghij"]
+    assert all(c["source"] == "doc.md" for c in chunks)
+
+
+def test_chunk_content_has_no_tail_duplicates():
+    """Test that no chunk lies entirely inside the previous one."""
+    chunks = chunk_content("abcdefgh", "doc.md", chunk_size=5, chunk_overlap=2)
+    assert [c["content"] for c in chunks] == ["abcde", "defgh"]
+    assert chunk_content("", "doc.md") == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,139 @@
+"""Tests for the retriever."""
+import numpy as np
+import pytest
+from src.rag import retriever
+from src.rag.chunk_store import ChunkStore, ParquetChunkStore, write_chunks, write_chunks_parquet
+
+
+class CountingIndex:
+    """Stand-in faiss index that records how often it is searched."""
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.searches = 0
+
+    def search(self, embedding, k):
+        self.searches += 1
+        ids = (self.ids + [-1] * k)[:k]
+        return np.zeros((1, k), dtype="float32"), np.array([ids], dtype="int64")
+
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch):
+    monkeypatch.setattr(retriever, "embed_text", lambda text: (1.0, 0.0))
+    retriever.clear_retriever_cache()
+    yield
+    retriever.clear_retriever_cache()
+
+
+def test_retrieve_caches_repeated_queries():
+    """Test that a repeated (query, k) is served without searching again."""
+    index = CountingIndex([1, 0])
+    chunks = [{"content": "a", "source": "a.md"}, {"content": "b", "source": "b.md"}]
+    first = retriever.retrieve("allowance", index, chunks, k=2)
+    second = retriever.retrieve("allowance", index, chunks, k=2)
+    assert first == second == [chunks[1], chunks[0]]
+    assert index.searches == 1
+    retriever.clear_retriever_cache()
+    retriever.retrieve("allowance", index, chunks, k=2)
+    assert index.searches == 2
+
+
+def test_retrieve_skips_padding():
+    """Test that faiss -1 padding is not returned as the last chunk."""
+    index = CountingIndex([0])
+    chunks = [{"content": "a", "source": "a.md"}, {"content": "b", "source": "b.md"}]
+    assert retriever.retrieve("allowance", index, chunks, k=3) == [chunks[0]]
+
+
+def test_retrieve_reuses_results_for_similar_queries(monkeypatch):
+    """Test that a near-duplicate query reuses a cached search with enough results."""
+    embeddings = {"allowance?": (1.0, 0.0), "the allowance": (0.99, 0.05), "other": (0.0, 1.0)}
+    monkeypatch.setattr(retriever, "embed_text", embeddings.get)
+    index = CountingIndex([1, 0])
+    chunks = [{"content": "a", "source": "a.md"}, {"content": "b", "source": "b.md"}]
+    retriever.retrieve("allowance?", index, chunks, k=2)
+    assert retriever.retrieve("the allowance", index, chunks, k=1) == [chunks[1]]
+    assert index.searches == 1
+    retriever.retrieve("other", index, chunks, k=2)
+    assert index.searches == 2
+
+
+def test_retrieval_cache_can_be_disabled(monkeypatch):
+    """Test that RETRIEVAL_CACHE_ENABLED=0 turns off near-duplicate reuse on its own."""
+    embeddings = {"allowance?": (1.0, 0.0), "the allowance": (0.99, 0.05)}
+    monkeypatch.setattr(retriever, "embed_text", embeddings.get)
+    monkeypatch.setattr(retriever, "RETRIEVAL_CACHE_ENABLED", False)
+    index = CountingIndex([1, 0])
+    chunks = [{"content": "a", "source": "a.md"}, {"content": "b", "source": "b.md"}]
+    retriever.retrieve("allowance?", index, chunks, k=2)
+    retriever.retrieve("the allowance", index, chunks, k=2)
+    assert index.searches == 2
+
+
+def test_retrieve_batch_searches_once(monkeypatch):
+    """Test that several queries share one embedding call and one search."""
+    calls = []
+
+    def fake_embed_texts(texts):
+        calls.append(texts)
+        return [(1.0, 0.0)] * len(texts)
+
+    monkeypatch.setattr(retriever, "embed_texts", fake_embed_texts)
+
+    class BatchIndex(CountingIndex):
+        def search(self, embedding, k):
+            self.searches += 1
+            return None, np.array([[0, -1], [1, 0]], dtype="int64")
+
+    index = BatchIndex([])
+    chunks = [{"content": "a", "source": "a.md"}, {"content": "b", "source": "b.md"}]
+    results = retriever.retrieve_batch(["first", "second"], index, chunks, k=2)
+    assert results == [[chunks[0]], [chunks[1], chunks[0]]]
+    assert calls == [["first", "second"]]
+    assert index.searches == 1
+
+
+def test_chunk_store_round_trip(tmp_path):
+    """Test that stored chunks read back by position, without embeddings."""
+    path = tmp_path / "chunks.jsonl"
+    write_chunks([
+        {"content": "Relocation allowance is $5,000", "source": "policy.md", "embedding": [0.1]},
+        {"content": "Schedule a walkthrough", "source": "agents.md"},
+    ], path)
+    store = ChunkStore(path)
+    assert len(store) == 2
+    assert store[0] == {"content": "Relocation allowance is $5,000", "source": "policy.md"}
+    assert store.take([1, 0])[0]["source"] == "agents.md"
+    with pytest.raises(IndexError):
+        store[2]
+    store.close()
+    store.close()  # idempotent
+
+
+def test_chunk_store_closes_file(tmp_path):
+    """Test that the store releases its file as a context manager."""
+    path = tmp_path / "chunks.jsonl"
+    write_chunks([{"content": "Schedule a walkthrough", "source": "agents.md"}], path)
+    with ChunkStore(path) as store:
+        assert store[0]["source"] == "agents.md"
+    assert store._file.closed
+
+
+def test_parquet_chunk_store_round_trip(tmp_path):
+    """Test that the parquet store returns the same chunks as the JSON lines store."""
+    pytest.importorskip("pyarrow")
+    chunks = [
+        {"content": "Relocation allowance is $5,000", "source": "policy.md"},
+        {"content": "Schedule a walkthrough", "source": "agents.md"},
+    ]
+    path = tmp_path / "chunks.parquet"
+    write_chunks_parquet(chunks, path)
+    store = ParquetChunkStore(path)
+    assert len(store) == 2
+    assert store[-1] == chunks[1]
+    assert store.take([1, 0]) == [chunks[1], chunks[0]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
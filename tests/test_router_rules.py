@@ -0,0 +1,51 @@
+"""Tests for rule-based routing."""
+import pytest
+from src.graph.router_rules import arithmetic_expression, classify, plan_first_action
+
+
+def test_arithmetic_expression_extracts_expression():
+    """Test that plain arithmetic questions yield the bare expression."""
+    assert arithmetic_expression("What is 10 * 5?") == "10 * 5"
+    assert arithmetic_expression("Calculate 2 + 2") == "2 + 2"
+    assert arithmetic_expression("-(5 + 2)") == "-(5 + 2)"
+
+
+def test_arithmetic_expression_rejects_non_arithmetic():
+    """Test that numbers without operators or with words are not arithmetic."""
+    assert arithmetic_expression("What is 2025?") is None
+    assert arithmetic_expression("Schedule 2 meetings at 10") is None
+
+
+def test_arithmetic_expression_rejects_dates_and_phone_numbers():
+    """Test that dates and phone numbers are not mistaken for subtraction or division."""
+    assert arithmetic_expression("What is 2025-11-15?") is None
+    assert arithmetic_expression("What is 10/11/2025?") is None
+    assert arithmetic_expression("555-123-4567") is None
+    assert plan_first_action("What is 2025-11-15?") is None
+    assert arithmetic_expression("100 - 25") == "100 - 25"
+    assert arithmetic_expression("10 / 4") == "10 / 4"
+
+
+def test_classify_labels():
+    """Test tool, rag and unknown classification."""
+    assert classify("Schedule a meeting with Xi next Tuesday") == "tool"
+    assert classify("What is the relocation allowance amount?") == "rag"
+    assert classify("Hello, how are you?") == "unknown"
+
+
+def test_plan_first_action():
+    """Test that only obvious queries get a rule-planned first action."""
+    action = plan_first_action("What is 10 * 5?")
+    assert action.tool_name == "safe_calculate"
+    assert action.arguments == {"expr": "10 * 5"}
+    assert action.terminal is True
+
+    action = plan_first_action("What is the relocation allowance amount?")
+    assert action.tool_name == "rag_search"
+    assert action.terminal is False
+
+    assert plan_first_action("Send a summary to Slack") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,7 +1,11 @@
 """Unit tests for agent tools."""
+import asyncio
 import pytest
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from src.tools.calculator import safe_calculate
+from src.tools import calendar_mock, slack
 from src.tools.slack import send_message, get_messages, list_channels
 
 
@@ -40,6 +44,201 @@ def test_safe_calculate_result_out_of_range():
     with pytest.raises(ValueError, match="Result out of allowed range"):
         safe_calculate("10 ** 10")
 
+
+def test_safe_calculate_matches_python_precedence():
+    """Test that the fast path follows Python's power/unary/float rules."""
+    assert safe_calculate("-2 ** 2") == -4
+    assert safe_calculate("2 ** 3 ** 2") == 512
+    assert safe_calculate("2 ** -1") == 0.5
+    assert safe_calculate("1.5 * .5") == 0.75
+    assert safe_calculate("--5") == 5
+
+
+def test_safe_calculate_falls_back_for_unusual_syntax():
+    """Test that expressions outside the fast path are handled by the AST evaluator."""
+    assert safe_calculate("1e3 + 1") == 1001
+    with pytest.raises(ValueError, match="Unsupported operation"):
+        safe_calculate("+5")
+    with pytest.raises(ValueError, match="Invalid expression"):
+        safe_calculate("2 * (3")
+
+# Calendar (temporary calendar file)
+
+
+@pytest.fixture
+def calendar_file(tmp_path, monkeypatch):
+    path = tmp_path / calendar_mock.CALENDAR_FILE.name
+    monkeypatch.setattr(calendar_mock, "CALENDAR_FILE", path)
+    monkeypatch.setattr(calendar_mock, "_CACHE", dict.fromkeys(calendar_mock._CACHE))
+    return path
+
+
+def test_calendar_create_and_list_events(calendar_file):
+    """Test that created events are listed in start order within the range."""
+    calendar_mock.create_event("Sync with recruiter", "2025-11-06T15:30", 30)
+    calendar_mock.create_event("Agent walkthrough", "2025-11-05T10:00", 60)
+    titles = [e["title"] for e in calendar_mock.list_events()]
+    assert titles == ["Agent walkthrough", "Sync with recruiter"]
+    day = calendar_mock.list_events("2025-11-05", "2025-11-05")
+    assert [e["title"] for e in day] == ["Agent walkthrough"]
+    assert calendar_mock.list_events("2025-11-05", "2025-11-05T09:59") == []
+    # Events created after a read are inserted into the already sorted view
+    calendar_mock.create_event("Team sync", "2025-11-05T09:00", 30)
+    titles = [e["title"] for e in calendar_mock.list_events()]
+    assert titles == ["Team sync", "Agent walkthrough", "Sync with recruiter"]
+    calendar_mock.clear_events()
+    assert calendar_mock.list_events() == []
+
+
+def test_calendar_bulk_create_events(calendar_file):
+    """Test that bulk-created events are written once and listed like single ones."""
+    created = calendar_mock.bulk_create_events([
+        {"title": "Team sync", "start_time": "2025-11-05T09:00", "duration_minutes": 30},
+        {"title": "Agent walkthrough", "start_time": "2025-11-05T10:00"},
+    ])
+    assert [e["end"] for e in created] == ["2025-11-05T09:30", "2025-11-05T11:00"]
+    assert len(calendar_file.read_text().splitlines()) == 2
+    assert calendar_mock.list_events("2025-11-05", "2025-11-05") == created
+    with pytest.raises(ValueError):
+        calendar_mock.bulk_create_events([{"title": "Bad", "start_time": "tomorrow"}])
+    assert len(calendar_mock.list_events()) == 2
+
+
+def test_calendar_list_today(calendar_file):
+    """Test that list_today covers today only, excluding tomorrow at midnight."""
+    today = datetime.now().date()
+    tomorrow = today + timedelta(days=1)
+    calendar_mock.create_event("Today", f"{today.isoformat()}T00:00")
+    calendar_mock.create_event("Tomorrow", f"{tomorrow.isoformat()}T00:00")
+    assert [e["title"] for e in calendar_mock.list_today()] == ["Today"]
+
+
+def test_calendar_concurrent_creates_keep_sorted_view(calendar_file):
+    """Test that events created from several threads all land in the sorted view."""
+    calendar_mock.list_events()  # build the sorted view so creates insert into it
+    start = datetime(2025, 11, 5, 9, 0)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(
+            lambda i: calendar_mock.create_event(
+                f"Event {i}", (start + timedelta(minutes=i)).isoformat(), 1),
+            range(50)))
+    starts, events = calendar_mock._sorted_events()
+    assert len(events) == len(starts) == 50
+    assert starts == sorted(starts)
+    assert [datetime.fromisoformat(e["start"]) for e in events] == starts
+    assert len(calendar_file.read_text().splitlines()) == 50
+
+
+def test_calendar_reloads_after_external_edit(calendar_file):
+    """Test that the parsed-calendar cache notices a changed file."""
+    calendar_mock.create_event("Team sync", "2025-11-05T09:00", 30)
+    assert len(calendar_mock.list_events()) == 1
+    calendar_file.write_text("")
+    assert calendar_mock.list_events() == []
+
+
+# Slack channel resolution (fake client, no network)
+
+
+class FakeSlackClient:
+    """Serves conversations_list in two pages and counts the calls."""
+
+    def __init__(self):
+        self.list_calls = 0
+        self.posted = []
+
+    def conversations_list(self, limit=None, cursor=None, **kwargs):
+        self.list_calls += 1
+        if cursor is None:
+            return {"channels": [{"name": "general", "id": "C1"}],
+                    "response_metadata": {"next_cursor": "page2"}}
+        return {"channels": [{"name": "new-channel", "id": "C2"}],
+                "response_metadata": {"next_cursor": ""}}
+
+    def chat_postMessage(self, channel, text):
+        self.posted.append(channel)
+        return {"ts": "1.0"}
+
+
+@pytest.fixture
+def fake_slack(monkeypatch):
+    fake = FakeSlackClient()
+    monkeypatch.setattr(slack, "_client", lambda: fake)
+    monkeypatch.setattr(slack, "_CHANNEL_ID_CACHE", {})
+    monkeypatch.setattr(slack, "_channel_map_loaded_at", None)
+    slack._resolve_channel_id.cache_clear()
+    slack._default_channel_id.cache_clear()
+    slack._list_channels_cached.cache_clear()
+    yield fake
+    slack._resolve_channel_id.cache_clear()
+    slack._default_channel_id.cache_clear()
+    slack._list_channels_cached.cache_clear()
+
+
+def test_resolve_channel_id_caches_all_pages(fake_slack):
+    """Test that one paginated fetch resolves every channel name afterwards."""
+    assert slack._resolve_channel_id("#new-channel") == "C2"
+    assert slack._resolve_channel_id("general") == "C1"
+    assert slack._resolve_channel_id("C999") == "C999"
+    assert fake_slack.list_calls == 2  # both pages, once
+    slack._invalidate_channel("#general")
+    assert slack._resolve_channel_id("#new-channel") == "C2"  # still in the name map
+    assert slack._resolve_channel_id("general") == "C1"
+    assert fake_slack.list_calls == 4  # refetched only for the forgotten name
+
+
+def test_resolve_channel_id_unknown_name(fake_slack):
+    """Test that unknown channel names raise ValueError, fetching the list only once."""
+    with pytest.raises(ValueError, match="not found"):
+        slack._resolve_channel_id("#missing")
+    with pytest.raises(ValueError, match="not found"):
+        slack._resolve_channel_id("other-missing")
+    assert fake_slack.list_calls == 2  # one paginated fetch for both misses
+
+
+def test_send_message_default_channel_resolved_once(fake_slack, monkeypatch):
+    """Test that the default channel is resolved on first use and then reused."""
+    monkeypatch.setattr(slack, "SLACK_DEFAULT_CHANNEL", "#general")
+    assert send_message("hi", raw=True) == "1.0"
+    assert send_message("again", raw=True) == "1.0"
+    assert fake_slack.posted == ["C1", "C1"]
+    assert fake_slack.list_calls == 2
+
+
+def test_list_channels_is_memoized(fake_slack):
+    """Test that repeated listings within the TTL reuse one paginated fetch."""
+    names = [ch["name"] for ch in list_channels()]
+    assert names == ["general", "new-channel"]
+    list_channels()
+    assert fake_slack.list_calls == 2
+
+
+def test_send_messages_posts_concurrently(fake_slack, monkeypatch):
+    """Test that a batch of messages is posted concurrently, results in order.
+
+    Channels are resolved before posting; an unknown one fails only its own message.
+    """
+    class FakeAsyncClient:
+        def __init__(self):
+            self.in_flight = self.max_in_flight = 0
+
+        async def chat_postMessage(self, channel, text):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return {"ts": f"{channel}-{text}"}
+
+    fake = FakeAsyncClient()
+    monkeypatch.setattr(slack, "_async_client", lambda: fake)
+    results = slack.send_messages(["hi", "there", "lost"], ["#general", "C9", "#missing"])
+    assert results[:2] == [
+        "Successfully sent message to #general. Message timestamp: C1-hi",
+        "Successfully sent message to C9. Message timestamp: C9-there",
+    ]
+    assert results[2].startswith("Failed to send message:")
+    assert fake.max_in_flight == 2
+
 # Slack integration tests
 
 
@@ -55,7 +254,7 @@ def test_create_slack_message():
     test_message = f"Test message at {time.time()}"
 
     # Send message
-    message_ts = send_message(test_message, channel)
+    message_ts = send_message(test_message, channel, raw=True)
     assert message_ts is not None, "Message should be sent successfully"
 
     # Wait a moment for Slack to process